@@ -0,0 +1,71 @@
+"""Compare two result files written by ``benchmarks.run``.
+
+    python -m benchmarks.compare before.json after.json --threshold 1.2
+
+Prints the ratio after/before of every metric (lower is better for all of
+them) and exits with status 1 if any ratio exceeds ``--threshold``.
+"""
+
+import argparse
+import json
+import sys
+
+METRICS = ("seconds", "bytes_per_node")
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(before, after, threshold):
+    rows = []
+    regressions = []
+    for name in sorted(set(before) | set(after)):
+        if name not in before or name not in after:
+            rows.append((name, "", None, None, "only in one file"))
+            continue
+        for metric in METRICS:
+            if metric not in before[name] or metric not in after[name]:
+                continue
+            old = before[name][metric]
+            new = after[name][metric]
+            if old:
+                ratio = new / old
+            else:
+                # nothing to compare against; unchanged zeros are not a regression
+                ratio = 1.0 if new == old else float("inf")
+            status = ""
+            if ratio > threshold:
+                status = "REGRESSION"
+                regressions.append(name)
+            elif ratio < 1 / threshold:
+                status = "improved"
+            rows.append((name, metric, old, new, "{:.2f}x {}".format(ratio, status)))
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args()
+    rows, regressions = compare(load(args.before), load(args.after), args.threshold)
+    width = max([len(r[0]) for r in rows] + [4])
+    for name, metric, old, new, note in rows:
+        if old is None:
+            print("{:<{}}  {}".format(name, width, note))
+        else:
+            print(
+                "{:<{}}  {:<14}  {:>12.6g}  {:>12.6g}  {}".format(
+                    name, width, metric, old, new, note
+                )
+            )
+    if regressions:
+        print("{} regression(s)".format(len(regressions)), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Micro-benchmark of filter expression construction.
+
+Builds ``--count`` expressions of the shape ``Ne(Not(lo < x), x <= hi)``
+using the fixed-arity nodes that ``Variable`` operators and the built-in
+functions create, and again with a replica of the original construction path
+(``BaseObject.__init__`` clock call, generic ``Exec``, per-node kwargs dict).
+
+    python -m benchmarks.expression_build --count 100000
+"""
+
+import argparse
+import json
+import time
+
+from sendo import base
+
+
+class ReferenceExec(base.Exec):
+    """Exec constructed the way it was before the fast path"""
+
+    def __init__(self, func, *args, **kwargs):
+        base.BaseObject.__init__(self)
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._updated_at = None
+
+
+def build_fast(x, lo, hi):
+    return base.Ne(base.Not(lo < x), x <= hi)
+
+
+def build_reference(x, lo, hi):
+    return ReferenceExec(
+        base.Ne,
+        ReferenceExec(base.Not, ReferenceExec(base.Lt, lo, x)),
+        ReferenceExec(base.Le, x, hi),
+    )
+
+
+def throughput(build, count):
+    """Expressions built per second"""
+    x = base.Variable(5)
+    lo = base.Variable(1)
+    hi = base.Variable(10)
+    start = time.perf_counter()
+    for _ in range(count):
+        build(x, lo, hi)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+    x = base.Variable(5)
+    assert build_fast(x, base.Variable(1), base.Variable(10)).value is True
+    fast = throughput(build_fast, args.count)
+    reference = throughput(build_reference, args.count)
+    print(
+        json.dumps(
+            {
+                "count": args.count,
+                "fast_per_second": fast,
+                "reference_per_second": reference,
+                "speedup": fast / reference,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
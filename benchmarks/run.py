@@ -0,0 +1,308 @@
+"""Run the sendo benchmark suite and write the results as JSON.
+
+    python -m benchmarks.run -o before.json
+    python -m benchmarks.run -o after.json
+    python -m benchmarks.compare before.json after.json
+
+Every case reports ``seconds`` (best of ``--repeat`` runs, lower is better);
+memory cases report ``bytes_per_node`` instead. ``--full`` adds the largest
+enumerator sizes (10^6 members), which take minutes to set up.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import sendo
+from sendo import base
+
+from . import expression_build
+
+CASES = {}
+
+
+def case(name):
+    def register(f):
+        CASES[name] = f
+        return f
+
+    return register
+
+
+def best_of(repeat, setup, run):
+    """Smallest wall time of ``run(setup())`` over ``repeat`` fresh setups"""
+    best = None
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def inc(x):
+    return x + 1
+
+
+def total(*xs):
+    return sum(xs)
+
+
+def build_chain(depth):
+    root = base.Variable(0)
+    f = base.Function(inc)
+    node = root
+    for _ in range(depth):
+        node = f(node)
+    return root, node
+
+
+def build_fan_in(width):
+    leaves = [base.Variable(i) for i in range(width)]
+    return leaves, base.Function(total)(*leaves)
+
+
+def build_fan_out(width):
+    root = base.Variable(0)
+    f = base.Function(inc)
+    return root, [f(root) for _ in range(width)]
+
+
+def build_diamond(width, depth):
+    root = base.Variable(0)
+    f = base.Function(total)
+    layer = [base.Function(inc)(root) for _ in range(width)]
+    for _ in range(depth):
+        layer = [f(layer[i], layer[(i + 1) % width]) for i in range(width)]
+    return root, base.Function(total)(*layer)
+
+
+def read_all(nodes):
+    for n in nodes:
+        n.value
+
+
+@case("graph")
+def graph_cases(args):
+    depth = args.depth
+    width = args.width
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), depth * 20))
+    shapes = {
+        "chain": lambda: build_chain(depth),
+        "fan_in": lambda: build_fan_in(width),
+        "fan_out": lambda: build_fan_out(width),
+        "diamond": lambda: build_diamond(max(2, width // 100), max(1, depth // 10)),
+    }
+
+    def cold(build):
+        return build
+
+    def warm(build):
+        def setup():
+            root, top = build()
+            read_all(top if isinstance(top, list) else [top])
+            return root, top
+
+        return setup
+
+    def write(root):
+        r = root[0] if isinstance(root, list) else root
+        r.value = r.value + 1
+
+    results = {}
+    for name, build in shapes.items():
+        results["graph.{}.build".format(name)] = best_of(
+            args.repeat, lambda: None, lambda _: build()
+        )
+        results["graph.{}.cold_read".format(name)] = best_of(
+            args.repeat,
+            cold(build),
+            lambda s: read_all(s[1] if isinstance(s[1], list) else [s[1]]),
+        )
+        results["graph.{}.warm_read".format(name)] = best_of(
+            args.repeat,
+            warm(build),
+            lambda s: read_all(s[1] if isinstance(s[1], list) else [s[1]]),
+        )
+
+        def write_read(s):
+            write(s[0])
+            read_all(s[1] if isinstance(s[1], list) else [s[1]])
+
+        results["graph.{}.write_read".format(name)] = best_of(
+            args.repeat, warm(build), write_read
+        )
+    return {k: {"seconds": v} for k, v in results.items()}
+
+
+class ListEnumerator(base.BaseEnumerator):
+    def __init__(self, members):
+        super(ListEnumerator, self).__init__()
+        self._members = members
+
+    def enumerate(self):
+        return iter(self._members)
+
+    def get_key(self, x):
+        return x.value[0]
+
+    def enter(self, x):
+        pass
+
+    def update(self, x):
+        pass
+
+    def exit(self, k):
+        pass
+
+
+@case("enumerator")
+def enumerator_cases(args):
+    sizes = [10**3, 10**4, 10**5] + ([10**6] if args.full else [])
+    results = {}
+    for size in sizes:
+        for churn in (0.0, 0.01, 0.1):
+
+            def setup():
+                members = [base.Variable((i, 0)) for i in range(size)]
+                sut = ListEnumerator(members)
+                sut.updated_at
+                n = int(size * churn)
+                # a third of the churn each: update, remove, add
+                for m in members[: n // 3]:
+                    m.value = (m.value[0], 1)
+                if n // 3:
+                    del members[-(n // 3) :]
+                members.extend(
+                    base.Variable((size + i, 0)) for i in range(n - 2 * (n // 3))
+                )
+                return sut
+
+            for method, run in (
+                ("try_update", lambda sut: sut._try_update()),
+                ("resync", lambda sut: sut.resync()),
+            ):
+                key = "enumerator.{}.n{}.churn{}".format(method, size, churn)
+                results[key] = {
+                    "seconds": best_of(max(1, args.repeat // 2), setup, run),
+                    "members": size,
+                }
+    return results
+
+
+@case("operator")
+def operator_cases(args):
+    n = args.width * 10
+    a = base.Variable(1)
+    b = base.Variable(2)
+    results = {}
+    for name, op in (
+        ("eq", lambda: a == b),
+        ("lt", lambda: a < b),
+        ("le", lambda: a <= b),
+        ("ne", lambda: a != b),
+        ("not", lambda: base.Not(a)),
+    ):
+
+        def run(_):
+            for _ in range(n):
+                op()
+
+        seconds = best_of(args.repeat, lambda: None, run)
+        results["operator.{}.build".format(name)] = {
+            "seconds": seconds,
+            "per_node": seconds / n,
+        }
+    results["operator.expression.build"] = {
+        "seconds": n / expression_build.throughput(expression_build.build_fast, n)
+    }
+    return results
+
+
+@case("memory")
+def memory_cases(args):
+    n = args.width * 10
+
+    def measure(build):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        keep = build()
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del keep
+        return (after - before) / n
+
+    def evaluated(nodes):
+        read_all(nodes)
+        return nodes
+
+    a = base.Variable(1)
+    f = base.Function(inc)
+    return {
+        "memory.variable": {
+            "bytes_per_node": measure(lambda: [base.Variable(i) for i in range(n)])
+        },
+        "memory.exec_unevaluated": {
+            "bytes_per_node": measure(lambda: [f(a) for _ in range(n)])
+        },
+        "memory.exec_evaluated": {
+            "bytes_per_node": measure(lambda: evaluated([f(a) for _ in range(n)]))
+        },
+        "memory.comparison": {
+            "bytes_per_node": measure(lambda: [a < a for _ in range(n)])
+        },
+    }
+
+
+def git_revision():
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", default="-", help="JSON file, - for stdout")
+    parser.add_argument("-k", "--cases", nargs="*", default=sorted(CASES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--depth", type=int, default=100)
+    parser.add_argument("--width", type=int, default=1000)
+    parser.add_argument("--full", action="store_true")
+    args = parser.parse_args()
+    results = {}
+    for name in args.cases:
+        print("running {} ...".format(name), file=sys.stderr)
+        results.update(CASES[name](args))
+    report = {
+        "meta": {
+            "sendo_version": sendo.__version__,
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare SharedVariable against queue-based propagation on the local host.
+
+A writer process publishes ``--updates`` new versions of an ``--size`` long
+array of doubles; the reader (this process) waits for every version and sums
+it. With a ``multiprocessing.Queue`` each version is pickled and copied; with
+``SharedVariable`` the reader polls the version in the shared header and reads
+the buffer in place.
+
+    python -m benchmarks.shared_variable --size 1000000 --updates 50
+"""
+
+import argparse
+import json
+import multiprocessing
+import time
+from array import array
+
+from sendo import base, shared
+
+
+def _queue_writer(q, ack, size, updates):
+    for i in range(updates):
+        q.put(array("d", [float(i)]) * size)
+        ack.get()
+
+
+def _shared_writer(name, ack, size, updates):
+    sut = shared.SharedVariable.attach(name)
+    for i in range(updates):
+        sut.value = array("d", [float(i)]) * size
+        ack.get()
+    sut.close()
+
+
+def bench_queue(size: int, updates: int) -> float:
+    q = multiprocessing.Queue()
+    ack = multiprocessing.Queue()
+    p = multiprocessing.Process(target=_queue_writer, args=(q, ack, size, updates))
+    start = time.perf_counter()
+    p.start()
+    for _ in range(updates):
+        sum(q.get())
+        ack.put(None)
+    elapsed = time.perf_counter() - start
+    p.join()
+    return elapsed
+
+
+def bench_shared(size: int, updates: int) -> float:
+    with shared.SharedVariable.create("d", size) as sv:
+        ack = multiprocessing.Queue()
+        total = base.Function(sum)(sv)
+        seen = sv.version
+        p = multiprocessing.Process(
+            target=_shared_writer, args=(sv.name, ack, size, updates)
+        )
+        start = time.perf_counter()
+        p.start()
+        for _ in range(updates):
+            while sv.version == seen:
+                time.sleep(0)
+            seen = sv.version
+            total.value
+            ack.put(None)
+        elapsed = time.perf_counter() - start
+        p.join()
+        del total
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--updates", type=int, default=50)
+    args = parser.parse_args()
+    result = {
+        "size": args.size,
+        "updates": args.updates,
+        "queue_seconds": bench_queue(args.size, args.updates),
+        "shared_seconds": bench_shared(args.size, args.updates),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
 from abc import ABCMeta, abstractmethod
-from datetime import datetime, timezone
-from itertools import chain
+from datetime import datetime, timedelta, timezone
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import chain, compress, islice, repeat
+from operator import attrgetter, lt
 
-from typing import Generic, TypeVar, Optional, Callable
+from typing import Generic, TypeVar, Optional, Callable, Set, List, Tuple
 
 try:
-    from typing import Mapping, Hashable, Iterable
+    from typing import Mapping, Hashable, Iterable, Iterator
 except ImportError:
-    from collections.abc import Mapping, Hashable, Iterable
+    from collections.abc import Mapping, Hashable, Iterable, Iterator
 
 
 class BaseError(Exception):
@@ -20,6 +23,20 @@ def get_dt():
     return datetime.utcnow().replace(tzinfo=timezone.utc)
 
 
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def dt_to_version(dt: datetime) -> int:
+    """Convert an aware datetime into an integer version (microseconds since epoch)"""
+    return (dt - EPOCH) // MICROSECOND
+
+
+def version_to_dt(version: int) -> datetime:
+    """Convert an integer version back into the datetime it was made from"""
+    return EPOCH + version * MICROSECOND
+
+
 class BaseObject(metaclass=ABCMeta):
     def __init__(self, updated_at: datetime = None):
         self._updated_at = updated_at if updated_at is not None else get_dt()
@@ -40,24 +57,32 @@ class BaseObject(metaclass=ABCMeta):
 T = TypeVar("T")
 
 
+# shared by every Exec called without keyword arguments; never mutated. A plain
+# dict (unlike a mappingproxy) keeps such nodes picklable and copyable
+EMPTY_KWARGS = {}
+
+
 class Exec(BaseObject):
     def __init__(self, func, *args, **kwargs):
-        super(Exec, self).__init__()
+        # BaseObject.__init__ is skipped: an Exec has no version until evaluated
         self._func = func
         self._args = args
-        self._kwargs = kwargs
+        self._kwargs = kwargs if kwargs else EMPTY_KWARGS
         self._updated_at = None
 
-    def _try_cache_result(self) -> None:
+    def _newest_updated_at(self) -> datetime:
         try:
-            newest = max(
+            return max(
                 map(
                     lambda d: d.updated_at,
                     chain([self._func], self._args, self._kwargs.values()),
                 )
             )
         except ValueError:
-            newest = get_dt()
+            return get_dt()
+
+    def _try_cache_result(self) -> None:
+        newest = self._newest_updated_at()
         if self._updated_at is None or newest > self._updated_at:
             self._cache_result()
             self._updated_at = newest
@@ -79,6 +104,40 @@ class Exec(BaseObject):
         return self._cached_result
 
 
+class UnaryExec(Exec):
+    """Exec of a function of exactly one positional argument"""
+
+    def __init__(self, func, a):
+        self._func = func
+        self._args = (a,)
+        self._kwargs = EMPTY_KWARGS
+        self._updated_at = None
+
+    def _newest_updated_at(self) -> datetime:
+        return max(self._func.updated_at, self._args[0].updated_at)
+
+    def _cache_result(self) -> None:
+        self._cached_result = self._func.value(self._args[0].value)
+
+
+class BinaryExec(Exec):
+    """Exec of a function of exactly two positional arguments"""
+
+    def __init__(self, func, a, b):
+        self._func = func
+        self._args = (a, b)
+        self._kwargs = EMPTY_KWARGS
+        self._updated_at = None
+
+    def _newest_updated_at(self) -> datetime:
+        a, b = self._args
+        return max(self._func.updated_at, a.updated_at, b.updated_at)
+
+    def _cache_result(self) -> None:
+        a, b = self._args
+        self._cached_result = self._func.value(a.value, b.value)
+
+
 class BaseFunction(BaseObject):
     def __init__(self):
         super(BaseFunction, self).__init__()
@@ -108,7 +167,31 @@ class Function(BaseObject):
         return Exec(self, *args, **kwargs)
 
 
-class EqBase(BaseFunction):
+class UnaryFunction(BaseFunction):
+    def __init__(self):
+        super(UnaryFunction, self).__init__()
+
+    @abstractmethod
+    def exec(self, a):
+        pass
+
+    def __call__(self, a) -> UnaryExec:
+        return UnaryExec(self, a)
+
+
+class BinaryFunction(BaseFunction):
+    def __init__(self):
+        super(BinaryFunction, self).__init__()
+
+    @abstractmethod
+    def exec(self, a, b):
+        pass
+
+    def __call__(self, a, b) -> BinaryExec:
+        return BinaryExec(self, a, b)
+
+
+class EqBase(BinaryFunction):
     def __init__(self):
         super(EqBase, self).__init__()
 
@@ -116,7 +199,7 @@ class EqBase(BaseFunction):
         return a == b
 
 
-class LtBase(BaseFunction):
+class LtBase(BinaryFunction):
     def __init__(self):
         super(LtBase, self).__init__()
 
@@ -124,7 +207,7 @@ class LtBase(BaseFunction):
         return a < b
 
 
-class LeBase(BaseFunction):
+class LeBase(BinaryFunction):
     def __init__(self):
         super(LeBase, self).__init__()
 
@@ -132,7 +215,7 @@ class LeBase(BaseFunction):
         return a <= b
 
 
-class NeBase(BaseFunction):
+class NeBase(BinaryFunction):
     def __init__(self):
         super(NeBase, self).__init__()
 
@@ -140,7 +223,7 @@ class NeBase(BaseFunction):
         return a != b
 
 
-class BoolBase(BaseFunction):
+class BoolBase(UnaryFunction):
     def __init__(self):
         super(BoolBase, self).__init__()
 
@@ -148,7 +231,7 @@ class BoolBase(BaseFunction):
         return bool(a)
 
 
-class NotBase(BaseFunction):
+class NotBase(UnaryFunction):
     def __init__(self):
         super(NotBase, self).__init__()
 
@@ -179,16 +262,16 @@ class Variable(BaseObject, Generic[T]):
         self._value = value
 
     def __eq__(self, other):
-        return Exec(Eq, self, other)
+        return BinaryExec(Eq, self, other)
 
     def __lt__(self, other):
-        return Exec(Lt, self, other)
+        return BinaryExec(Lt, self, other)
 
     def __le__(self, other):
-        return Exec(Le, self, other)
+        return BinaryExec(Le, self, other)
 
     def __ne__(self, other):
-        return Exec(Ne, self, other)
+        return BinaryExec(Ne, self, other)
 
     def __bool__(self):
         raise TypeError(
@@ -196,7 +279,73 @@ class Variable(BaseObject, Generic[T]):
         )
 
 
+class ChangeLog:
+    """Mixin remembering which indices of an array-valued object changed lately"""
+
+    change_log_size = 64
+
+    def _init_change_log(self, version: int) -> None:
+        self._changes = deque(maxlen=self.change_log_size)
+        self._change_log_floor = version
+
+    def _log_change(self, version: int, indices: Iterable[int]) -> None:
+        if len(self._changes) == self._changes.maxlen:
+            self._change_log_floor = self._changes[0][0]
+        self._changes.append((version, indices))
+
+    def _reset_change_log(self, version: int) -> None:
+        self._changes.clear()
+        self._change_log_floor = version
+
+    def changed_since(self, dt: datetime) -> Optional[Set[int]]:
+        """Indices changed after ``dt``, or None if the log cannot tell"""
+        version = dt_to_version(dt)
+        if version < self._change_log_floor:
+            return None
+        indices = set()
+        for v, idx in reversed(self._changes):
+            if v <= version:
+                break
+            indices.update(idx)
+        return indices
+
+
+def _chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _bounded_map(
+    executor: Executor, func: Callable, iterable: Iterable, window: int
+) -> Iterator[Tuple]:
+    # like Executor.map with at most ``window`` calls in flight; yields
+    # (item, result) pairs so the items never travel back from the worker
+    futures = deque()
+    for x in iterable:
+        futures.append((x, executor.submit(func, x)))
+        if len(futures) >= window:
+            x, future = futures.popleft()
+            yield x, future.result()
+    while futures:
+        x, future = futures.popleft()
+        yield x, future.result()
+
+
+_get_updated_at = attrgetter("updated_at")
+# recorded version of keys an enumerator has not seen yet
+_UNSEEN = datetime.min.replace(tzinfo=timezone.utc)
+
+
 class BaseEnumerator(BaseObject):
+    # opt-in: set on a subclass to make every sync go through resync(), which
+    # pays off with bulk enter_many/update_many/exit_many or an executor
+    resync_chunk_size: Optional[int] = None
+    resync_executor: Optional[Executor] = None
+
     def __init__(
         self,
         key_updated_at_map: Optional[Mapping[Hashable, datetime]] = None,
@@ -252,7 +401,138 @@ class BaseEnumerator(BaseObject):
         if self._updated_at is None or self._updated_at < x:
             self._updated_at = x
 
+    def enter_many(self, xs: List) -> None:
+        for x in xs:
+            self.enter(x)
+
+    def add_many(
+        self, xs: List, keys: List[Hashable], updated_ats: List[datetime]
+    ) -> None:
+        self.enter_many(xs)
+        self._key_updated_at_map.update(zip(keys, updated_ats))
+        self._try_update_updated_at(self.get_addition_dt())
+
+    def update_many(self, xs: List) -> None:
+        for x in xs:
+            self.update(x)
+
+    def update_value_many(
+        self, xs: List, keys: List[Hashable], updated_ats: List[datetime]
+    ) -> None:
+        self.update_many(xs)
+        self._key_updated_at_map.update(zip(keys, updated_ats))
+        self._try_update_updated_at(max(updated_ats))
+
+    def exit_many(self, keys: List[Hashable]) -> None:
+        for k in keys:
+            self.exit(k)
+
+    def discard_many(self, keys: List[Hashable]) -> None:
+        self.exit_many(keys)
+        for k in keys:
+            del self._key_updated_at_map[k]
+        self._try_update_updated_at(self.get_deletion_dt())
+
+    def _fingerprint(self, chunk: List) -> Tuple[List, List]:
+        return list(map(self.get_key, chunk)), list(map(_get_updated_at, chunk))
+
+    def _sync_chunk(
+        self, chunk: List, keys: List[Hashable], updated_ats: List[datetime]
+    ) -> None:
+        olds = list(map(self._key_updated_at_map.get, keys, repeat(_UNSEEN)))
+        if olds == updated_ats:
+            return
+        # members whose recorded version is older than the current one
+        stale = compress(range(len(keys)), map(lt, olds, updated_ats))
+        added = []
+        updated = []
+        for i in stale:
+            if olds[i] is _UNSEEN:
+                added.append(i)
+            else:
+                updated.append(i)
+        changed = [keys[i] for i in chain(added, updated)]
+        if len(set(changed)) != len(changed):
+            # a key repeated within the chunk: sync it the way _try_update does
+            for i in sorted(chain(added, updated)):
+                if keys[i] not in self._key_updated_at_map:
+                    self.add(chunk[i])
+                elif self._key_updated_at_map[keys[i]] < updated_ats[i]:
+                    self.update_value(chunk[i])
+            return
+        if added:
+            self.add_many(
+                [chunk[i] for i in added],
+                [keys[i] for i in added],
+                [updated_ats[i] for i in added],
+            )
+        if updated:
+            self.update_value_many(
+                [chunk[i] for i in updated],
+                [keys[i] for i in updated],
+                [updated_ats[i] for i in updated],
+            )
+
+    def resync(
+        self,
+        chunk_size: int = 4096,
+        executor: Optional[Executor] = None,
+        window: int = 4,
+    ) -> None:
+        """Reconcile with ``enumerate`` in bulk.
+
+        Members are taken ``chunk_size`` at a time and additions, updates and
+        removals are applied through ``enter_many``, ``update_many`` and
+        ``exit_many``. A chunk in which a changed key is enumerated more than
+        once is synced member by member, as ``_try_update`` does.
+
+        Keys and versions of each chunk are computed in the calling thread, or
+        by a thread-based ``executor`` with at most ``window`` chunks in flight.
+        Members are handed to ``enter_many`` and ``update_many`` as enumerated,
+        so process-based executors, which would only see copies, are rejected.
+        """
+        if isinstance(executor, ProcessPoolExecutor):
+            raise TypeError("resync needs a thread-based executor")
+        chunks = _chunked(self.enumerate(), chunk_size)
+        if executor is None:
+            fingerprints = ((c, self._fingerprint(c)) for c in chunks)
+        else:
+            fingerprints = _bounded_map(executor, self._fingerprint, chunks, window)
+        seen = set()
+        for chunk, (keys, updated_ats) in fingerprints:
+            self._sync_chunk(chunk, keys, updated_ats)
+            seen.update(keys)
+        # every enumerated key is known by now; anything beyond them is gone
+        if len(self._key_updated_at_map) > len(seen):
+            self.discard_many(list(self._key_updated_at_map.keys() - seen))
+
+    def stream(self, page_size: int = 1024, pages: bool = False) -> Iterator:
+        """Sync with ``enumerate`` lazily, yielding members as they are synced.
+
+        ``enumerate`` is consumed ``page_size`` members at a time and each page
+        is reconciled before it is handed out, one member at a time or, with
+        ``pages``, as a list. Removals are applied once the stream is
+        exhausted; if the consumer stops early they are left for the next sync.
+        Other syncs may run while the stream is consumed.
+        """
+        unchecked = set(self._key_updated_at_map.keys())
+        for chunk in _chunked(self.enumerate(), page_size):
+            keys, updated_ats = self._fingerprint(chunk)
+            self._sync_chunk(chunk, keys, updated_ats)
+            unchecked.difference_update(keys)
+            if pages:
+                yield chunk
+            else:
+                yield from chunk
+        # a sync run by the consumer meanwhile may have discarded some already
+        gone = [k for k in unchecked if k in self._key_updated_at_map]
+        if gone:
+            self.discard_many(gone)
+
     def _try_update(self) -> None:
+        if self.resync_chunk_size is not None:
+            self.resync(self.resync_chunk_size, self.resync_executor)
+            return
         unchecked = set(self._key_updated_at_map.keys())
         for d in self.enumerate():
             key = self.get_key(d)
@@ -0,0 +1,223 @@
+from abc import abstractmethod
+from array import array
+from copy import copy
+from itertools import repeat
+
+try:
+    from typing import Iterable
+except ImportError:
+    from collections.abc import Iterable
+
+from typing import List
+
+from .base import BaseFunction, ChangeLog, Exec, dt_to_version
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _is_ndarray(x) -> bool:
+    return numpy is not None and isinstance(x, numpy.ndarray) and x.ndim > 0
+
+
+def _is_column(x) -> bool:
+    return isinstance(x, (list, tuple, array)) or _is_ndarray(x)
+
+
+def _as_numpy(x):
+    # view array.array columns as ndarrays (no copy) so that numpy handles them
+    if numpy is not None and isinstance(x, array) and x.typecode != "u":
+        return numpy.frombuffer(x, dtype=x.typecode)
+    return x
+
+
+def _column_length(args) -> int:
+    for a in args:
+        if _is_column(a):
+            return len(a)
+    return -1
+
+
+class ElementwiseFunction(BaseFunction):
+    """Function applied element by element to array-valued arguments.
+
+    ndarray and ``array.array`` arguments are evaluated in a single numpy
+    call when numpy is installed; other sequences (``list``, ``tuple``) are
+    mapped in Python. Scalar arguments are broadcast.
+    """
+
+    def __init__(self):
+        super(ElementwiseFunction, self).__init__()
+
+    @abstractmethod
+    def op(self, *args):
+        pass
+
+    @abstractmethod
+    def numpy_op(self, *args):
+        pass
+
+    def exec(self, *args):
+        args = tuple(map(_as_numpy, args))
+        if any(map(_is_ndarray, args)):
+            return self.numpy_op(*args)
+        if not any(map(_is_column, args)):
+            return self.op(*args)
+        return list(map(self.op, *(a if _is_column(a) else repeat(a) for a in args)))
+
+    def refresh(self, result, indices: Iterable[int], *args) -> None:
+        """Recompute ``result`` in place at ``indices`` only"""
+        if _is_ndarray(result):
+            idx = numpy.fromiter(indices, dtype=numpy.intp)
+            result[idx] = self.numpy_op(
+                *(
+                    numpy.asarray(_as_numpy(a))[idx] if _is_column(a) else a
+                    for a in args
+                )
+            )
+        else:
+            for i in indices:
+                result[i] = self.op(*(a[i] if _is_column(a) else a for a in args))
+
+    def __call__(self, *args) -> "ElementwiseExec":
+        return ElementwiseExec(self, *args)
+
+
+class ElementwiseExec(Exec, ChangeLog):
+    """Exec refreshing only the changed slice of its result.
+
+    When every updated argument can report the indices changed since the last
+    evaluation (see ``ChangeLog.changed_since``), only those indices of the
+    cached result are recomputed. The refresh is done on a copy of the cached
+    result, so a list or ndarray returned by an earlier ``value`` never changes
+    under its holder.
+    """
+
+    def __init__(self, func: ElementwiseFunction, *args):
+        super(ElementwiseExec, self).__init__(func, *args)
+        self._init_change_log(0)
+
+    def _changed_indices(self):
+        if self._func.updated_at > self._updated_at:
+            return None
+        length = _column_length((self._cached_result,))
+        if length < 0:
+            return None
+        indices = set()
+        for a in self._args:
+            if a.updated_at <= self._updated_at:
+                continue
+            changed_since = getattr(a, "changed_since", None)
+            if changed_since is None or _column_length((a.value,)) != length:
+                return None
+            changed = changed_since(self._updated_at)
+            if changed is None:
+                return None
+            indices.update(changed)
+        return indices
+
+    def _refresh_result(self, indices: List[int], version: int) -> None:
+        result = copy(self._cached_result)
+        self._func.refresh(result, indices, *(a.value for a in self._args))
+        self._cached_result = result
+        self._log_change(version, indices)
+
+    def _try_cache_result(self) -> None:
+        newest = self._newest_updated_at()
+        if self._updated_at is None:
+            self._cache_result()
+            self._reset_change_log(dt_to_version(newest))
+        elif newest > self._updated_at:
+            indices = self._changed_indices()
+            if indices is None:
+                self._cache_result()
+                self._reset_change_log(dt_to_version(newest))
+            else:
+                self._refresh_result(sorted(indices), dt_to_version(newest))
+        else:
+            return
+        self._updated_at = newest
+
+    def __bool__(self):
+        value = self.value
+        if _is_column(value):
+            raise TypeError(
+                "elementwise result cannot cast directly to bool. Use .value instead"
+            )
+        return bool(value)
+
+
+class EqBase(ElementwiseFunction):
+    def __init__(self):
+        super(EqBase, self).__init__()
+
+    def op(self, a, b):
+        return a == b
+
+    def numpy_op(self, a, b):
+        return numpy.equal(a, b)
+
+
+class LtBase(ElementwiseFunction):
+    def __init__(self):
+        super(LtBase, self).__init__()
+
+    def op(self, a, b):
+        return a < b
+
+    def numpy_op(self, a, b):
+        return numpy.less(a, b)
+
+
+class LeBase(ElementwiseFunction):
+    def __init__(self):
+        super(LeBase, self).__init__()
+
+    def op(self, a, b):
+        return a <= b
+
+    def numpy_op(self, a, b):
+        return numpy.less_equal(a, b)
+
+
+class NeBase(ElementwiseFunction):
+    def __init__(self):
+        super(NeBase, self).__init__()
+
+    def op(self, a, b):
+        return a != b
+
+    def numpy_op(self, a, b):
+        return numpy.not_equal(a, b)
+
+
+class BoolBase(ElementwiseFunction):
+    def __init__(self):
+        super(BoolBase, self).__init__()
+
+    def op(self, a):
+        return bool(a)
+
+    def numpy_op(self, a):
+        return numpy.asarray(a).astype(bool)
+
+
+class NotBase(ElementwiseFunction):
+    def __init__(self):
+        super(NotBase, self).__init__()
+
+    def op(self, a):
+        return not a
+
+    def numpy_op(self, a):
+        return numpy.logical_not(a)
+
+
+Eq = EqBase()
+Lt = LtBase()
+Le = LeBase()
+Ne = NeBase()
+Bool = BoolBase()
+Not = NotBase()
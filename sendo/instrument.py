@@ -0,0 +1,278 @@
+"""Opt-in per-node instrumentation.
+
+While a ``Profiler`` is enabled, the hot methods of ``Exec`` and
+``BaseEnumerator`` (and of their subclasses overriding them) are replaced by
+recording wrappers; ``disable`` puts the original functions back, so there is
+no cost at all when profiling is off.
+
+    with Profiler() as p:
+        graph.value
+    p.stats()          # aggregate numbers per node, as a dict
+    p.chrome_trace()   # chrome://tracing / Perfetto JSON
+    p.folded()         # collapsed stacks for flamegraph.pl / speedscope
+"""
+
+import functools
+import os
+import threading
+import time
+import weakref
+from collections import defaultdict
+
+from typing import Dict, List, Optional
+
+from .base import BaseEnumerator, BaseError, Exec, Function
+
+# method name -> event kind
+EXEC_METHODS = {
+    "_try_cache_result": "freshness",
+    "_cache_result": "exec",
+    # ElementwiseExec recomputing only the changed slice of its result
+    "_refresh_result": "refresh",
+}
+ENUMERATOR_METHODS = {
+    "_try_update": "sync",
+    "resync": "resync",
+    "add": "add",
+    "update_value": "update",
+    "discard": "discard",
+}
+# bulk variants used by BaseEnumerator.resync; counted per member
+BULK_ENUMERATOR_METHODS = {
+    "add_many": "add",
+    "update_value_many": "update",
+    "discard_many": "discard",
+}
+
+
+class ProfilerError(BaseError):
+    """Raised when profilers are enabled on top of each other"""
+
+    pass
+
+
+_active = None
+
+
+def _subclasses(cls):
+    yield cls
+    for c in cls.__subclasses__():
+        yield from _subclasses(c)
+
+
+class _Frame:
+    __slots__ = ("label", "kind", "children_ns", "recomputed")
+
+    def __init__(self, label: str, kind: str):
+        self.label = label
+        self.kind = kind
+        self.children_ns = 0
+        self.recomputed = False
+
+
+class Profiler:
+    def __init__(self, trace: bool = True):
+        self._trace = trace
+        self._labels = {}
+        self._counter = 0
+        self._patched = []
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        self._nodes = defaultdict(lambda: defaultdict(int))
+        self._folded = defaultdict(int)
+        self._events = []
+        self._origin_ns = time.perf_counter_ns()
+
+    def _set_label(self, obj, name: str) -> None:
+        # labels are keyed by id (nodes are not hashable) and dropped as soon
+        # as the node is collected, so that its id is not reused with them
+        key = id(obj)
+        labels = self._labels
+
+        def forget(ref):
+            if labels.get(key, (None,))[0] is ref:
+                del labels[key]
+
+        labels[key] = (weakref.ref(obj, forget), name)
+
+    def label(self, obj, name: str) -> None:
+        """Report ``obj`` as ``name`` instead of an automatically made label"""
+        self._set_label(obj, name)
+
+    def label_of(self, obj) -> str:
+        try:
+            return self._labels[id(obj)][1]
+        except KeyError:
+            pass
+        if isinstance(obj, Exec):
+            func = obj._func
+            if isinstance(func, Function):
+                prefix = getattr(func.value, "__qualname__", type(func.value).__name__)
+            else:
+                prefix = type(func).__name__
+        else:
+            prefix = type(obj).__name__
+        self._counter += 1
+        name = "{}#{}".format(prefix, self._counter)
+        self._set_label(obj, name)
+        return name
+
+    def _stack(self) -> List[_Frame]:
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def _record(self, kind: str, original, obj, args, kwargs, weight: int = 1):
+        label = self.label_of(obj)
+        stack = self._stack()
+        frame = _Frame(label, kind)
+        stack.append(frame)
+        start = time.perf_counter_ns()
+        try:
+            return original(obj, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            stack.pop()
+            self_ns = elapsed - frame.children_ns
+            if stack:
+                stack[-1].children_ns += elapsed
+            node = self._nodes[label]
+            node[kind + "_count"] += weight
+            node[kind + "_ns"] += elapsed
+            node[kind + "_self_ns"] += self_ns
+            if kind in ("exec", "refresh"):
+                if stack and stack[-1].label == label:
+                    stack[-1].recomputed = True
+            elif kind == "freshness" and not frame.recomputed:
+                node["cache_hits"] += 1
+            self._folded[
+                tuple("{} [{}]".format(f.label, f.kind) for f in stack)
+                + ("{} [{}]".format(label, kind),)
+            ] += self_ns
+            if self._trace:
+                self._events.append(
+                    (label, kind, start, elapsed, threading.get_ident())
+                )
+
+    def _wrap(self, kind: str, original):
+        record = self._record
+
+        @functools.wraps(original)
+        def wrapper(obj, *args, **kwargs):
+            return record(kind, original, obj, args, kwargs)
+
+        return wrapper
+
+    def _wrap_bulk(self, kind: str, original):
+        record = self._record
+
+        @functools.wraps(original)
+        def wrapper(obj, members, *args, **kwargs):
+            return record(kind, original, obj, (members,) + args, kwargs, len(members))
+
+        return wrapper
+
+    def enable(self) -> None:
+        global _active
+        if _active is not None:
+            raise ProfilerError("another Profiler is already enabled")
+        _active = self
+        for root, methods, wrap in (
+            (Exec, EXEC_METHODS, self._wrap),
+            (BaseEnumerator, ENUMERATOR_METHODS, self._wrap),
+            (BaseEnumerator, BULK_ENUMERATOR_METHODS, self._wrap_bulk),
+        ):
+            for cls in set(_subclasses(root)):
+                for name, kind in methods.items():
+                    if name in cls.__dict__:
+                        original = cls.__dict__[name]
+                        self._patched.append((cls, name, original))
+                        setattr(cls, name, wrap(kind, original))
+
+    def disable(self) -> None:
+        global _active
+        while self._patched:
+            cls, name, original = self._patched.pop()
+            setattr(cls, name, original)
+        if _active is self:
+            _active = None
+
+    def __enter__(self) -> "Profiler":
+        self.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.disable()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Aggregate numbers per node label; times are in seconds.
+
+        ``recomputes``/``exec_time`` cover ``exec`` itself (inclusive of the
+        arguments' ``value``), ``partial_recomputes``/``refresh_time`` the
+        slice refreshes of elementwise nodes, ``freshness_time`` is the time
+        spent in the freshness walk excluding nested nodes, and enumerators report
+        ``sync_time``, ``resync_time`` and ``adds``/``updates``/``discards``.
+        """
+        result = {}
+        for label, node in self._nodes.items():
+            entry = {}
+            if node["freshness_count"] or node["exec_count"]:
+                entry.update(
+                    recomputes=node["exec_count"],
+                    partial_recomputes=node["refresh_count"],
+                    cache_hits=node["cache_hits"],
+                    exec_time=node["exec_ns"] / 1e9,
+                    exec_self_time=node["exec_self_ns"] / 1e9,
+                    refresh_time=node["refresh_ns"] / 1e9,
+                    freshness_checks=node["freshness_count"],
+                    freshness_time=node["freshness_self_ns"] / 1e9,
+                )
+            if any(node[k + "_count"] for k in ("sync", "resync", "add", "discard")):
+                entry.update(
+                    syncs=node["sync_count"],
+                    sync_time=node["sync_ns"] / 1e9,
+                    sync_self_time=node["sync_self_ns"] / 1e9,
+                    resyncs=node["resync_count"],
+                    resync_time=node["resync_ns"] / 1e9,
+                    adds=node["add_count"],
+                    updates=node["update_count"],
+                    discards=node["discard_count"],
+                )
+            result[label] = entry
+        return result
+
+    def top(self, key: str = "exec_time", n: int = 10) -> List[str]:
+        """Labels of the ``n`` nodes with the largest ``key`` in ``stats``"""
+        stats = self.stats()
+        return sorted(stats, key=lambda k: stats[k].get(key, 0), reverse=True)[:n]
+
+    def chrome_trace(self) -> Dict:
+        """Recorded events in the Chrome trace event format (``ph: X``)"""
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": label,
+                    "cat": kind,
+                    "ph": "X",
+                    "ts": (start - self._origin_ns) / 1e3,
+                    "dur": elapsed / 1e3,
+                    "pid": pid,
+                    "tid": tid,
+                }
+                for label, kind, start, elapsed, tid in self._events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def folded(self, unit_ns: Optional[int] = 1000) -> str:
+        """Collapsed stacks (``a;b;c weight``) weighted by self time in ``unit_ns``"""
+        return "\n".join(
+            "{} {}".format(";".join(path), ns // unit_ns)
+            for path, ns in self._folded.items()
+            if ns // unit_ns > 0
+        )
@@ -0,0 +1,215 @@
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime
+from multiprocessing import resource_tracker, shared_memory
+
+from typing import Optional, Tuple
+
+from .base import BaseError, BaseObject, get_dt, dt_to_version, version_to_dt
+
+
+class CapacityError(BaseError):
+    """Raised when a value does not fit in the shared memory segment"""
+
+    pass
+
+
+class FormatError(BaseError):
+    """Raised when a value's item format does not match the segment typecode"""
+
+    pass
+
+
+class StaleWriterError(BaseError):
+    """Raised when a write stays in progress for longer than the read timeout"""
+
+    pass
+
+
+def _native_format(fmt: str) -> Optional[str]:
+    # "d", "@d", "=d" or "<d" on a little endian host are all native doubles
+    native = "<" if sys.byteorder == "little" else ">"
+    if fmt[:1] in ("@", "=", native):
+        fmt = fmt[1:]
+    elif fmt[:1] in ("<", ">", "!"):
+        return None
+    return fmt
+
+
+# seq (odd while a write is in progress), version, nbytes, typecode
+HEADER = struct.Struct("<qqq8s")
+HEADER_SIZE = 64
+
+
+# names of the segments created (and so registered) by this process
+_created = set()
+
+
+def _open(name: str) -> shared_memory.SharedMemory:
+    try:
+        # python >= 3.13: do not let this process' resource tracker unlink it
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+    # older pythons register every attached segment, so the tracker of an
+    # exiting reader would unlink it; the creator's registration is kept
+    if os.name == "posix" and name not in _created:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class SharedVariable(BaseObject):
+    """Variable whose value lives in a ``multiprocessing.shared_memory`` segment.
+
+    The segment starts with a header holding a sequence counter and the version
+    (``updated_at`` as microseconds since epoch) of the current value, so that
+    ``Exec`` nodes in any process attached to the segment detect staleness by
+    reading the header only. ``value`` is a zero-copy ``memoryview`` cast to
+    the typecode; ``snapshot`` returns a consistent copy. A single writer at a
+    time is assumed.
+    """
+
+    # seconds a reader waits for an in-progress write before giving up
+    read_timeout = 1.0
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool = False):
+        self._shm = shm
+        self._owner = owner
+        self._typecode = self._read_header()[3]
+
+    @classmethod
+    def create(
+        cls,
+        typecode: str,
+        capacity: int,
+        value=None,
+        name: Optional[str] = None,
+    ) -> "SharedVariable":
+        """Allocate a segment for ``capacity`` items of ``typecode``"""
+        itemsize = array(typecode).itemsize
+        shm = shared_memory.SharedMemory(
+            name=name, create=True, size=HEADER_SIZE + capacity * itemsize
+        )
+        _created.add(shm.name)
+        HEADER.pack_into(
+            shm.buf, 0, 0, dt_to_version(get_dt()), 0, typecode.encode("ascii")
+        )
+        sut = cls(shm, owner=True)
+        if value is not None:
+            sut.value = value
+        return sut
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedVariable":
+        """Open a segment created by ``SharedVariable.create`` in another process"""
+        return cls(_open(name))
+
+    def __reduce__(self):
+        return (SharedVariable.attach, (self.name,))
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def typecode(self) -> str:
+        return self._typecode
+
+    @property
+    def capacity(self) -> int:
+        return (self._shm.size - HEADER_SIZE) // array(self._typecode).itemsize
+
+    def _retry(self, attempt: int, started: float) -> None:
+        # spin briefly, then back off; give up if the writer seems to be gone
+        if attempt < 100:
+            return
+        if time.monotonic() - started > self.read_timeout:
+            raise StaleWriterError(
+                "shared segment {} has been mid-write for over {}s".format(
+                    self.name, self.read_timeout
+                )
+            )
+        time.sleep(min(0.001, 1e-6 * attempt))
+
+    def _read_header(self) -> Tuple[int, int, int, str]:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            seq, version, nbytes, typecode = HEADER.unpack_from(self._shm.buf, 0)
+            if seq % 2 == 0 and HEADER.unpack_from(self._shm.buf, 0)[0] == seq:
+                return seq, version, nbytes, typecode.rstrip(b"\0").decode("ascii")
+            attempt += 1
+            self._retry(attempt, started)
+
+    @property
+    def version(self) -> int:
+        return self._read_header()[1]
+
+    @property
+    def updated_at(self) -> datetime:
+        return version_to_dt(self.version)
+
+    @property
+    def value(self) -> memoryview:
+        nbytes = self._read_header()[2]
+        return self._shm.buf[HEADER_SIZE : HEADER_SIZE + nbytes].cast(self._typecode)
+
+    @value.setter
+    def value(self, value):
+        view = memoryview(value)
+        itemsize = array(self._typecode).itemsize
+        if _native_format(view.format) != self._typecode or view.itemsize != itemsize:
+            raise FormatError(
+                "cannot write items of format {!r} into segment {} "
+                "of typecode {!r}".format(view.format, self.name, self._typecode)
+            )
+        data = view.cast("B")
+        if HEADER_SIZE + data.nbytes > self._shm.size:
+            raise CapacityError(
+                "value of {} bytes does not fit in shared segment {}".format(
+                    data.nbytes, self.name
+                )
+            )
+        buf = self._shm.buf
+        seq, version, _, typecode = HEADER.unpack_from(buf, 0)
+        # keep the version strictly increasing even if the clock does not move
+        version = max(dt_to_version(get_dt()), version + 1)
+        struct.pack_into("<q", buf, 0, seq + 1)
+        buf[HEADER_SIZE : HEADER_SIZE + data.nbytes] = data
+        HEADER.pack_into(buf, 0, seq + 2, version, data.nbytes, typecode)
+
+    def snapshot(self) -> array:
+        """Copy of the current value that is never torn by a concurrent write"""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            seq, _, nbytes, _ = self._read_header()
+            result = array(self._typecode)
+            result.frombytes(self._shm.buf[HEADER_SIZE : HEADER_SIZE + nbytes])
+            if HEADER.unpack_from(self._shm.buf, 0)[0] == seq:
+                return result
+            attempt += 1
+            self._retry(attempt, started)
+
+    def close(self) -> None:
+        self._shm.close()
+
+    def unlink(self) -> None:
+        self._shm.unlink()
+        _created.discard(self.name)
+
+    def __enter__(self) -> "SharedVariable":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def __bool__(self):
+        raise TypeError(
+            "sendo object cannot cast directly to bool. Use sendo.Not(obj) instead"
+        )
@@ -0,0 +1,247 @@
+"""Persist graph state to disk and warm start from it.
+
+``save`` walks every node reachable from the given roots and stores
+``Variable`` values, ``Exec`` cached results, enumerator bookkeeping and the
+``updated_at`` of all of them. ``load`` walks a freshly built graph of the same
+shape and puts that state back, so an ``Exec`` whose inputs did not change
+since the snapshot is served from it without running ``exec`` again.
+
+Nodes are addressed by their path from a root (``name.0``, ``name.key``, ...),
+so the graph has to be rebuilt the same way before loading. Functions are
+assumed to be unchanged between the two runs.
+"""
+
+import os
+import pickle
+import re
+import uuid
+
+from typing import Iterator, Set, Tuple
+
+try:
+    from typing import Mapping
+except ImportError:
+    from collections.abc import Mapping
+
+from .base import (
+    BaseEnumerator,
+    BaseError,
+    BaseFunction,
+    BaseObject,
+    ChangeLog,
+    Exec,
+    Function,
+    Variable,
+    dt_to_version,
+)
+from .table import Cell, Row, VariableArray, VariableTable
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+MANIFEST = "manifest.pickle"
+FORMAT_VERSION = 2
+# large arrays live in their own subdirectory, named <save uuid>.<node>.npy
+ARRAYS = "arrays"
+ARRAY_FILENAME = re.compile(r"[0-9a-f]{32}\.[0-9]+\.npy")
+
+# ndarrays at least this large are written to their own .npy file and
+# memory-mapped (copy-on-write) when loaded
+MMAP_THRESHOLD = 1 << 20
+
+
+class SnapshotFormatError(BaseError):
+    """Raised when a snapshot was written in a format this version cannot read"""
+
+    pass
+
+
+class _ArrayRef:
+    def __init__(self, filename: str):
+        self.filename = filename
+
+
+def _walk(name: str, obj, seen: Set[int]) -> Iterator[Tuple[str, BaseObject]]:
+    if not isinstance(obj, BaseObject) or id(obj) in seen:
+        return
+    seen.add(id(obj))
+    if isinstance(obj, Cell):
+        yield from _walk(name + ".array", obj._array, seen)
+        return
+    if isinstance(obj, Row):
+        yield from _walk(name + ".table", obj._table, seen)
+        return
+    if isinstance(obj, VariableTable):
+        for k, c in obj._columns.items():
+            yield from _walk("{}.{}".format(name, k), c, seen)
+        return
+    yield name, obj
+    if isinstance(obj, Exec):
+        yield from _walk(name + ".func", obj._func, seen)
+        for i, a in enumerate(obj._args):
+            yield from _walk("{}.{}".format(name, i), a, seen)
+        for k, a in obj._kwargs.items():
+            yield from _walk("{}.{}".format(name, k), a, seen)
+
+
+def _same(a, b) -> bool:
+    try:
+        return bool(a == b)
+    except ValueError:
+        return numpy is not None and numpy.array_equal(a, b)
+
+
+def _dump_state(obj) -> dict:
+    if isinstance(obj, Exec):
+        if obj._updated_at is None:
+            return None
+        return {"updated_at": obj._updated_at, "value": obj._cached_result}
+    if isinstance(obj, VariableArray):
+        return {
+            "updated_at": obj._updated_at,
+            "value": obj._values,
+            "versions": obj._versions,
+        }
+    if isinstance(obj, Variable):
+        return {"updated_at": obj._updated_at, "value": obj._value}
+    if isinstance(obj, BaseEnumerator):
+        state = {
+            "updated_at": obj._updated_at,
+            "key_updated_at_map": dict(obj._key_updated_at_map),
+        }
+        if hasattr(obj, "_cached_result"):
+            state["value"] = obj._cached_result
+        return state
+    if isinstance(obj, (BaseFunction, Function)):
+        return {"updated_at": obj._updated_at}
+    return None
+
+
+def _restore_state(obj, state: dict, overwrite: bool) -> bool:
+    updated_at = state["updated_at"]
+    if isinstance(obj, Exec):
+        obj._cached_result = state["value"]
+        obj._updated_at = updated_at
+    elif isinstance(obj, VariableArray):
+        if not overwrite and obj._values != state["value"]:
+            return False
+        obj._values = state["value"]
+        obj._versions = state["versions"]
+        obj._updated_at = updated_at
+    elif isinstance(obj, Variable):
+        if overwrite:
+            obj._value = state["value"]
+        elif not _same(obj._value, state["value"]):
+            return False
+        obj._updated_at = updated_at
+    elif isinstance(obj, BaseEnumerator):
+        obj._key_updated_at_map = state["key_updated_at_map"]
+        if "value" in state:
+            obj._cached_result = state["value"]
+        obj._updated_at = updated_at
+    elif isinstance(obj, (BaseFunction, Function)):
+        if updated_at < obj._updated_at:
+            obj._updated_at = updated_at
+    else:
+        return False
+    if isinstance(obj, ChangeLog):
+        obj._reset_change_log(dt_to_version(obj._updated_at))
+    return True
+
+
+def _is_large_ndarray(x) -> bool:
+    return (
+        numpy is not None
+        and isinstance(x, numpy.ndarray)
+        and x.dtype != object
+        and x.nbytes >= MMAP_THRESHOLD
+    )
+
+
+def _replace(filename: str, write) -> None:
+    # never truncate a file in place: it may be memory-mapped by a loaded graph
+    tmp = filename + ".tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, filename)
+
+
+def _remove_unreferenced(directory: str, referenced: Set[str]) -> None:
+    for filename in os.listdir(directory):
+        if ARRAY_FILENAME.fullmatch(filename) and filename not in referenced:
+            try:
+                os.remove(os.path.join(directory, filename))
+            except OSError:
+                # still memory-mapped on a platform that forbids removing it
+                pass
+
+
+def save(path: str, roots: Mapping[str, BaseObject]) -> None:
+    """Write the state of every node reachable from ``roots`` under ``path``"""
+    directory = os.path.join(path, ARRAYS)
+    os.makedirs(directory, exist_ok=True)
+    # arrays get names unique to this save, so the previous manifest keeps
+    # pointing at its own files until the new one replaces it
+    prefix = uuid.uuid4().hex
+    nodes = {}
+    arrays = set()
+    seen = set()
+    for root_name, root in roots.items():
+        for name, obj in _walk(root_name, root, seen):
+            state = _dump_state(obj)
+            if state is None:
+                continue
+            if _is_large_ndarray(state.get("value")):
+                filename = "{}.{}.npy".format(prefix, len(nodes))
+                _replace(
+                    os.path.join(directory, filename),
+                    lambda f: numpy.save(f, state["value"]),
+                )
+                state["value"] = _ArrayRef(filename)
+                arrays.add(filename)
+            nodes[name] = state
+    _replace(
+        os.path.join(path, MANIFEST),
+        lambda f: pickle.dump({"format": FORMAT_VERSION, "nodes": nodes}, f),
+    )
+    _remove_unreferenced(directory, arrays)
+
+
+def load(
+    path: str, roots: Mapping[str, BaseObject], overwrite: bool = False
+) -> Set[str]:
+    """Restore the state saved by ``save`` into the graph reachable from ``roots``.
+
+    Variables keep their current value and only adopt the snapshot version
+    when that value equals the saved one, so their dependents are recomputed
+    exactly when the input changed. With ``overwrite``, the saved values
+    replace the current values of ``Variable`` and ``VariableArray`` nodes
+    instead. Returns the names of the nodes that were restored.
+    """
+    with open(os.path.join(path, MANIFEST), "rb") as f:
+        manifest = pickle.load(f)
+    if manifest.get("format") != FORMAT_VERSION:
+        raise SnapshotFormatError(
+            "snapshot in {} has format {!r}, expected {}".format(
+                path, manifest.get("format"), FORMAT_VERSION
+            )
+        )
+    nodes = manifest["nodes"]
+    restored = set()
+    seen = set()
+    for root_name, root in roots.items():
+        for name, obj in _walk(root_name, root, seen):
+            state = nodes.get(name)
+            if state is None:
+                continue
+            if isinstance(state.get("value"), _ArrayRef):
+                state["value"] = numpy.load(
+                    os.path.join(path, ARRAYS, state["value"].filename),
+                    mmap_mode="c",
+                )
+            if _restore_state(obj, state, overwrite):
+                restored.add(name)
+    return restored
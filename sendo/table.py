@@ -0,0 +1,293 @@
+from array import array
+from datetime import datetime
+
+from typing import List, Tuple, Union
+
+try:
+    from typing import Mapping, Iterable
+except ImportError:
+    from collections.abc import Mapping, Iterable
+
+from . import elementwise
+from .base import (
+    BaseError,
+    BaseObject,
+    ChangeLog,
+    Variable,
+    get_dt,
+    dt_to_version,
+    version_to_dt,
+)
+
+
+class LengthMismatchError(BaseError):
+    """Raised when columns of a table do not share the same number of rows"""
+
+    pass
+
+
+Indices = Union[slice, Iterable[int]]
+
+
+def _normalize_indices(indices: Iterable[int], n: int) -> List[int]:
+    touched = []
+    for i in indices:
+        if not -n <= i < n:
+            raise IndexError("index {} out of range for length {}".format(i, n))
+        touched.append(i % n)
+    return touched
+
+
+class VariableArray(BaseObject, ChangeLog):
+    """Column of scalar values stored in an ``array.array``.
+
+    Every element carries its own integer version so that an ``Exec`` depending
+    on a single cell is only recomputed when that cell changes. Comparison
+    operators build elementwise nodes over the whole column.
+    """
+
+    def __init__(self, typecode: str, values: Iterable = ()):
+        super(VariableArray, self).__init__()
+        version = dt_to_version(self._updated_at)
+        self._values = array(typecode, values)
+        self._versions = array("q", [version]) * len(self._values)
+        self._init_change_log(version)
+
+    @property
+    def typecode(self) -> str:
+        return self._values.typecode
+
+    @property
+    def value(self) -> array:
+        return self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, index: int) -> "Cell":
+        return self.cell(index)
+
+    def cell(self, index: int) -> "Cell":
+        n = len(self._values)
+        if not -n <= index < n:
+            raise IndexError("VariableArray index out of range")
+        return Cell(self, index % n)
+
+    def cell_updated_at(self, index: int) -> datetime:
+        return version_to_dt(self._versions[index])
+
+    def _prepare(self, indices: Indices, values: Iterable) -> Tuple[Indices, array]:
+        # validate everything up front so that a failing set writes nothing
+        values = array(self._values.typecode, values)
+        if isinstance(indices, slice):
+            touched = range(*indices.indices(len(self._values)))
+        else:
+            touched = _normalize_indices(indices, len(self._values))
+        if len(touched) != len(values):
+            raise LengthMismatchError(
+                "{} indices but {} values passed to VariableArray.set".format(
+                    len(touched), len(values)
+                )
+            )
+        return touched, values
+
+    def _write(self, touched: Indices, values: array, dt: datetime) -> None:
+        version = dt_to_version(dt)
+        if isinstance(touched, range) and touched.step > 0:
+            # a negative step has no slice equivalent once stop is normalized
+            s = slice(touched.start, touched.stop, touched.step)
+            self._values[s] = values
+            self._versions[s] = array("q", [version]) * len(values)
+        else:
+            for i, v in zip(touched, values):
+                self._values[i] = v
+                self._versions[i] = version
+        self._log_change(version, touched)
+        self._updated_at = dt
+
+    def set(self, indices: Indices, values: Iterable) -> None:
+        self._write(*self._prepare(indices, values), get_dt())
+
+    def __eq__(self, other):
+        return elementwise.Eq(self, other)
+
+    def __lt__(self, other):
+        return elementwise.Lt(self, other)
+
+    def __le__(self, other):
+        return elementwise.Le(self, other)
+
+    def __ne__(self, other):
+        return elementwise.Ne(self, other)
+
+    def __bool__(self):
+        raise TypeError(
+            "sendo object cannot cast directly to bool. Use sendo.Not(obj) instead"
+        )
+
+
+class ArrayVariable(Variable, ChangeLog):
+    """Variable holding a mutable sequence (list, ``array.array`` or ndarray).
+
+    ``set`` writes into the held sequence in place and records the touched
+    indices, so elementwise dependents only refresh that slice.
+    """
+
+    def __init__(self, value):
+        super(ArrayVariable, self).__init__(value)
+        self._init_change_log(dt_to_version(self._updated_at))
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._updated_at = get_dt()
+        self._value = value
+        self._reset_change_log(dt_to_version(self._updated_at))
+
+    def set(self, indices: Indices, values: Iterable) -> None:
+        dt = get_dt()
+        if isinstance(indices, slice):
+            touched = range(*indices.indices(len(self._value)))
+        else:
+            touched = _normalize_indices(indices, len(self._value))
+        values = list(values)
+        if len(touched) != len(values):
+            raise LengthMismatchError(
+                "indices and values passed to ArrayVariable.set differ in length"
+            )
+        for i, v in zip(touched, values):
+            self._value[i] = v
+        self._updated_at = dt
+        self._log_change(dt_to_version(dt), touched)
+
+    def __eq__(self, other):
+        return elementwise.Eq(self, other)
+
+    def __lt__(self, other):
+        return elementwise.Lt(self, other)
+
+    def __le__(self, other):
+        return elementwise.Le(self, other)
+
+    def __ne__(self, other):
+        return elementwise.Ne(self, other)
+
+
+class Cell(Variable):
+    """Lightweight handle on one element of a ``VariableArray``"""
+
+    def __init__(self, array: VariableArray, index: int):
+        # the value and version live in the array; nothing is stored here
+        self._array = array
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def updated_at(self) -> datetime:
+        return self._array.cell_updated_at(self._index)
+
+    @property
+    def value(self):
+        return self._array._values[self._index]
+
+    @value.setter
+    def value(self, value):
+        self._array.set((self._index,), (value,))
+
+
+class Row(BaseObject):
+    """Lightweight handle on one row of a ``VariableTable``"""
+
+    def __init__(self, table: "VariableTable", index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def updated_at(self) -> datetime:
+        return max(
+            c.cell_updated_at(self._index) for c in self._table._columns.values()
+        )
+
+    @property
+    def value(self) -> Mapping:
+        return {k: c._values[self._index] for k, c in self._table._columns.items()}
+
+    def __bool__(self):
+        raise TypeError(
+            "sendo object cannot cast directly to bool. Use sendo.Not(obj) instead"
+        )
+
+
+class VariableTable(BaseObject):
+    """Set of equally long ``VariableArray`` columns addressed by name"""
+
+    def __init__(self, columns: Mapping[str, VariableArray]):
+        super(VariableTable, self).__init__()
+        self._columns = dict(columns)
+        if len(set(map(len, self._columns.values()))) > 1:
+            raise LengthMismatchError(
+                "all columns of a VariableTable must have the same length"
+            )
+
+    @property
+    def columns(self) -> Iterable[str]:
+        return self._columns.keys()
+
+    def __len__(self) -> int:
+        for c in self._columns.values():
+            return len(c)
+        return 0
+
+    def __getitem__(self, name: str) -> VariableArray:
+        return self._columns[name]
+
+    def row(self, index: int) -> Row:
+        n = len(self)
+        if not -n <= index < n:
+            raise IndexError("VariableTable index out of range")
+        return Row(self, index % n)
+
+    def cell(self, index: int, name: str) -> Cell:
+        return self._columns[name].cell(index)
+
+    def set(self, indices: Indices, values: Mapping[str, Iterable]) -> None:
+        unknown = set(values) - set(self._columns)
+        if unknown:
+            raise KeyError(
+                "unknown column(s): {}".format(", ".join(map(repr, sorted(unknown))))
+            )
+        if not isinstance(indices, slice):
+            indices = tuple(indices)
+        prepared = [
+            (self._columns[name], self._columns[name]._prepare(indices, v))
+            for name, v in values.items()
+        ]
+        dt = get_dt()
+        for column, (touched, v) in prepared:
+            column._write(touched, v, dt)
+
+    @property
+    def updated_at(self) -> datetime:
+        try:
+            return max(c.updated_at for c in self._columns.values())
+        except ValueError:
+            return self._updated_at
+
+    @property
+    def value(self) -> Mapping[str, array]:
+        return {k: c.value for k, c in self._columns.items()}
+
+    def __bool__(self):
+        raise TypeError(
+            "sendo object cannot cast directly to bool. Use sendo.Not(obj) instead"
+        )
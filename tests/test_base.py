@@ -1,5 +1,7 @@
 from unittest import TestCase
 
+import copy
+import pickle
 import time
 
 from sendo import base
@@ -122,6 +124,42 @@ class FunctionTestCase(TestCase):
         self.assertEqual(some_function(another_function(a), b), sut2.value)
 
 
+class FixedArityExecTestCase(TestCase):
+    def test_builtin_comparisons_build_fixed_arity_nodes(self):
+        a = base.Variable(3)
+        b = base.Variable(4)
+        self.assertIsInstance(a == b, base.BinaryExec)
+        self.assertIsInstance(a < b, base.BinaryExec)
+        self.assertIsInstance(base.Le(a, b), base.BinaryExec)
+        self.assertIsInstance(base.Not(a), base.UnaryExec)
+        self.assertIsInstance(base.Bool(a), base.UnaryExec)
+
+    def test_exec_without_kwargs_shares_empty_kwargs(self):
+        a = base.Variable(3)
+        f = base.Function(lambda x, y=1: x + y)
+        self.assertIs(f(a)._kwargs, base.EMPTY_KWARGS)
+        self.assertIs((a < a)._kwargs, base.EMPTY_KWARGS)
+        self.assertEqual(f(a, y=base.Variable(2)).value, 5)
+
+    def test_exec_without_kwargs_pickles_and_copies(self):
+        a = base.Variable(3)
+        b = base.Variable(4)
+        for sut in (a < b, base.Not(a), base.Exec(base.Lt, a, b)):
+            self.assertEqual(pickle.loads(pickle.dumps(sut)).value, sut.value)
+            self.assertEqual(copy.copy(sut).value, sut.value)
+            self.assertEqual(copy.deepcopy(sut).value, sut.value)
+
+    def test_fixed_arity_nodes_track_updates(self):
+        a = base.Variable(3)
+        b = base.Variable(4)
+        sut = base.Not(a < b)
+        self.assertFalse(sut.value)
+        time.sleep(0.01)
+        b.value = 1
+        self.assertTrue(sut.value)
+        self.assertEqual(sut.updated_at, b.updated_at)
+
+
 class BaseEnumeratorTestCase(TestCase):
     class EnumListMember(base.BaseEnumerator):
         def __init__(self, target_list):
@@ -188,6 +226,177 @@ class BaseEnumeratorTestCase(TestCase):
         self.assertTrue(sut.updated_at < t)
 
 
+class BulkResyncTestCase(TestCase):
+    class EnumDict(base.BaseEnumerator):
+        def __init__(self, target_list):
+            super(BulkResyncTestCase.EnumDict, self).__init__()
+            self._target_list = target_list
+            self._cached_result = {}
+            self.calls = []
+
+        def enumerate(self):
+            return iter(self._target_list)
+
+        def get_key(self, x):
+            return x.value[0]
+
+        def enter(self, x):
+            self._cached_result[self.get_key(x)] = x.value[1]
+
+        def update(self, x):
+            self._cached_result[self.get_key(x)] = x.value[1]
+
+        def exit(self, k):
+            del self._cached_result[k]
+
+        def enter_many(self, xs):
+            self.calls.append(("enter", len(xs)))
+            super(BulkResyncTestCase.EnumDict, self).enter_many(xs)
+
+        def update_many(self, xs):
+            self.calls.append(("update", len(xs)))
+            super(BulkResyncTestCase.EnumDict, self).update_many(xs)
+
+        def exit_many(self, keys):
+            self.calls.append(("exit", len(keys)))
+            super(BulkResyncTestCase.EnumDict, self).exit_many(keys)
+
+    def assert_resync(self, **kwargs):
+        members = [base.Variable((i, i)) for i in range(10)]
+        sut = self.EnumDict(members)
+        sut.resync(chunk_size=4, **kwargs)
+        self.assertEqual(sut._cached_result, {i: i for i in range(10)})
+        self.assertEqual(sut.calls, [("enter", 4), ("enter", 4), ("enter", 2)])
+        sut.calls.clear()
+        time.sleep(0.01)
+        members[1].value = (1, 100)
+        members[5].value = (5, 500)
+        del members[8:]
+        members.append(base.Variable((10, 10)))
+        sut.resync(chunk_size=4, **kwargs)
+        expected = {i: i for i in range(8)}
+        expected.update({1: 100, 5: 500, 10: 10})
+        self.assertEqual(sut._cached_result, expected)
+        self.assertEqual(
+            sut.calls, [("update", 1), ("update", 1), ("enter", 1), ("exit", 2)]
+        )
+        self.assertEqual(set(sut._key_updated_at_map), set(expected))
+        self.assertTrue(sut.updated_at >= members[5].updated_at)
+
+    def test_resync_applies_changes_in_bulk(self):
+        self.assert_resync()
+
+    def test_resync_with_executor(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            self.assert_resync(executor=executor)
+
+    def test_resync_with_executor_window(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            self.assert_resync(executor=executor, window=1)
+
+    def test_resync_enters_enumerated_members(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        members = [base.Variable((i, i)) for i in range(5)]
+        sut = self.EnumDict(members)
+        entered = []
+        sut.enter = entered.append
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            sut.resync(chunk_size=2, executor=executor)
+        self.assertEqual(list(map(id, entered)), list(map(id, members)))
+
+    def test_resync_matches_try_update_with_duplicate_keys(self):
+        for chunk_size in (1, 2, 8):
+            members = [base.Variable((i, i)) for i in range(3)]
+            sut = self.EnumDict(members)
+            sut.resync(chunk_size=chunk_size)
+            members[:] = [members[0], base.Variable((0, 0)), members[1]]
+            sut.resync(chunk_size=chunk_size)
+            self.assertEqual(sut._cached_result, {0: 0, 1: 1})
+            self.assertEqual(set(sut._key_updated_at_map), {0, 1})
+            members.append(base.Variable((5, 5)))
+            time.sleep(0.01)
+            members.append(base.Variable((5, 6)))
+            sut.resync(chunk_size=chunk_size)
+            self.assertEqual(sut._cached_result, {0: 0, 1: 1, 5: 6})
+
+    def test_resync_rejects_process_executor(self):
+        from concurrent.futures import ProcessPoolExecutor
+
+        sut = self.EnumDict([base.Variable((0, 0))])
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            with self.assertRaises(TypeError):
+                sut.resync(executor=executor)
+
+    def test_resync_chunk_size_makes_every_sync_bulk(self):
+        members = [base.Variable((i, i)) for i in range(3)]
+        sut = self.EnumDict(members)
+        sut.resync_chunk_size = 2
+        self.assertEqual(sut.value, {0: 0, 1: 1, 2: 2})
+        self.assertEqual(sut.calls, [("enter", 2), ("enter", 1)])
+
+
+class StreamTestCase(TestCase):
+    class PagedSource(BulkResyncTestCase.EnumDict):
+        def __init__(self, target_list):
+            super(StreamTestCase.PagedSource, self).__init__(target_list)
+            self.fetched = 0
+
+        def enumerate(self):
+            for x in self._target_list:
+                self.fetched += 1
+                yield x
+
+    def test_stream_yields_members_as_they_are_synced(self):
+        members = [base.Variable((i, i)) for i in range(5)]
+        sut = self.PagedSource(members)
+        it = sut.stream(page_size=2)
+        first = next(it)
+        self.assertIs(first, members[0])
+        self.assertEqual(sut.fetched, 2)
+        self.assertEqual(sut._cached_result, {0: 0, 1: 1})
+        self.assertEqual(list(it), members[1:])
+        self.assertEqual(sut._cached_result, {i: i for i in range(5)})
+
+    def test_stream_yields_pages(self):
+        members = [base.Variable((i, i)) for i in range(5)]
+        sut = self.PagedSource(members)
+        self.assertEqual(list(map(len, sut.stream(page_size=2, pages=True))), [2, 2, 1])
+
+    def test_stream_survives_a_sync_while_it_is_consumed(self):
+        members = [base.Variable((i, i)) for i in range(6)]
+        sut = self.PagedSource(members)
+        list(sut.stream())
+        it = sut.stream(page_size=2)
+        next(it)
+        members.pop()
+        self.assertEqual(sut.value, {i: i for i in range(5)})
+        self.assertEqual(list(it), members[1:])
+        self.assertEqual(sut._cached_result, {i: i for i in range(5)})
+        self.assertEqual(set(sut._key_updated_at_map), set(range(5)))
+
+    def test_stream_keeps_bookkeeping_for_next_sync(self):
+        members = [base.Variable((i, i)) for i in range(4)]
+        sut = self.PagedSource(members)
+        list(sut.stream(page_size=3))
+        time.sleep(0.01)
+        members[0].value = (0, 10)
+        del members[3]
+        it = sut.stream(page_size=2)
+        next(it)
+        self.assertEqual(sut._cached_result[0], 10)
+        self.assertIn(3, sut._cached_result)
+        del it
+        sut._try_update()
+        self.assertEqual(sut._cached_result, {0: 10, 1: 1, 2: 2})
+        self.assertEqual(list(sut.stream()), members)
+        self.assertEqual(sut._cached_result, {0: 10, 1: 1, 2: 2})
+
+
 class EqTestCase(TestCase):
     def test_eq_returns_true_if_a_eq_b(self):
         Int = base.Variable[int]
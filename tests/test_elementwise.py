@@ -0,0 +1,149 @@
+from unittest import TestCase, skipUnless
+
+import time
+
+from sendo import base, elementwise, table
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ElementwiseTestCase(TestCase):
+    class CountingLt(elementwise.LtBase):
+        def __init__(self):
+            super(ElementwiseTestCase.CountingLt, self).__init__()
+            self._exec_count = 0
+            self._refreshed = []
+
+        def exec(self, *args):
+            self._exec_count += 1
+            return super(ElementwiseTestCase.CountingLt, self).exec(*args)
+
+        def refresh(self, result, indices, *args):
+            self._refreshed.append(list(indices))
+            super(ElementwiseTestCase.CountingLt, self).refresh(result, indices, *args)
+
+    def test_function_without_numpy_op_cannot_be_created(self):
+        class Half(elementwise.ElementwiseFunction):
+            def op(self, a):
+                return a / 2
+
+        with self.assertRaises(TypeError):
+            Half()
+
+    def test_elementwise_comparisons_over_sequences(self):
+        a = base.Variable([1, 2, 3])
+        b = base.Variable([3, 2, 1])
+        self.assertEqual(elementwise.Eq(a, b).value, [False, True, False])
+        self.assertEqual(elementwise.Lt(a, b).value, [True, False, False])
+        self.assertEqual(elementwise.Le(a, b).value, [True, True, False])
+        self.assertEqual(elementwise.Ne(a, b).value, [True, False, True])
+        self.assertEqual(elementwise.Bool(a).value, [True, True, True])
+        self.assertEqual(elementwise.Not(b).value, [False, False, False])
+
+    def test_scalar_arguments_are_broadcast(self):
+        a = table.VariableArray("d", [0.1, 0.5, 0.9])
+        t = base.Variable(0.5)
+        self.assertEqual(list(elementwise.Lt(a, t).value), [True, False, False])
+        self.assertEqual(list((a <= t).value), [True, True, False])
+
+    def test_scalar_only_arguments_behave_like_builtin(self):
+        a = base.Variable(3)
+        b = base.Variable(4)
+        sut = elementwise.Lt(a, b)
+        self.assertTrue(sut.value)
+        self.assertTrue(sut)
+
+    def test_direct_bool_of_column_causes_type_error(self):
+        a = table.VariableArray("l", [1, 2])
+        with self.assertRaises(TypeError):
+            _ = bool(a)
+        with self.assertRaises(TypeError):
+            _ = bool(a == a)
+
+    def test_only_changed_slice_is_refreshed(self):
+        f = self.CountingLt()
+        a = table.VariableArray("l", range(6))
+        t = base.Variable(3)
+        sut = f(a, t)
+        self.assertEqual(list(sut.value), [True] * 3 + [False] * 3)
+        self.assertEqual(f._exec_count, 1)
+        time.sleep(0.01)
+        a.set([0, 5], [10, -1])
+        self.assertEqual(list(sut.value), [False, True, True, False, False, True])
+        self.assertEqual(f._exec_count, 1)
+        self.assertEqual(f._refreshed, [[0, 5]])
+        time.sleep(0.01)
+        t.value = 100
+        self.assertEqual(list(sut.value), [True] * 6)
+        self.assertEqual(f._exec_count, 2)
+
+    def test_incremental_refresh_propagates_through_nested_nodes(self):
+        f = self.CountingLt()
+        a = table.ArrayVariable([1, 2, 3, 4])
+        t = base.Variable(3)
+        sut = elementwise.Not(f(a, t))
+        self.assertEqual(list(sut.value), [False, False, True, True])
+        time.sleep(0.01)
+        a.set(slice(0, 1), [5])
+        self.assertEqual(list(sut.value), [True, False, True, True])
+        self.assertEqual(f._exec_count, 1)
+        self.assertEqual(sut._changes[-1][1], [0])
+
+    def test_falls_back_to_full_recompute_when_log_is_exceeded(self):
+        f = self.CountingLt()
+        a = table.VariableArray("l", range(3))
+        sut = f(a, base.Variable(1))
+        self.assertEqual(list(sut.value), [True, False, False])
+        time.sleep(0.01)
+        for i in range(a.change_log_size + 1):
+            a.set([i % 3], [i])
+        self.assertEqual(list(sut.value), [i < 1 for i in a.value])
+        self.assertEqual(f._exec_count, 2)
+
+    @skipUnless(numpy is not None, "numpy is not installed")
+    def test_ndarray_is_evaluated_in_one_call(self):
+        f = self.CountingLt()
+        a = table.ArrayVariable(numpy.arange(5))
+        sut = f(a, base.Variable(2))
+        numpy.testing.assert_array_equal(sut.value, numpy.arange(5) < 2)
+        time.sleep(0.01)
+        a.set([4], [0])
+        numpy.testing.assert_array_equal(
+            sut.value, numpy.array([True, True, False, False, True])
+        )
+        self.assertEqual(f._exec_count, 1)
+        numpy.testing.assert_array_equal(
+            elementwise.Not(a).value, numpy.array([True, False, False, False, True])
+        )
+
+    def test_returned_value_is_not_changed_by_later_refresh(self):
+        f = self.CountingLt()
+        a = table.ArrayVariable([1, 2, 3, 4])
+        sut = f(a, base.Variable(4))
+        held = sut.value
+        time.sleep(0.01)
+        a.set([0], [10])
+        self.assertEqual(sut.value, [False, True, True, False])
+        self.assertEqual(f._refreshed, [[0]])
+        self.assertEqual(held, [True, True, True, False])
+
+    def test_array_variable_set_checks_indices_before_writing(self):
+        a = table.ArrayVariable([1, 2, 3])
+        with self.assertRaises(IndexError):
+            a.set([0, 9], [5, 5])
+        self.assertEqual(a.value, [1, 2, 3])
+
+    @skipUnless(numpy is not None, "numpy is not installed")
+    def test_array_columns_are_evaluated_with_numpy(self):
+        a = table.VariableArray("d", [0.1, 0.5, 0.9])
+        sut = a < base.Variable(0.5)
+        self.assertIsInstance(sut.value, numpy.ndarray)
+        numpy.testing.assert_array_equal(sut.value, [True, False, False])
+        held = sut.value
+        time.sleep(0.01)
+        a.set([2], [0.0])
+        numpy.testing.assert_array_equal(sut.value, [True, False, True])
+        numpy.testing.assert_array_equal(held, [True, False, False])
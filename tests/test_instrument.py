@@ -0,0 +1,149 @@
+from unittest import TestCase
+
+import gc
+import json
+import time
+
+from sendo import base, elementwise, instrument, table
+
+
+class ProfilerTestCase(TestCase):
+    class EnumList(base.BaseEnumerator):
+        def __init__(self, target_list):
+            super(ProfilerTestCase.EnumList, self).__init__()
+            self._target_list = target_list
+            self._cached_result = None
+
+        def enumerate(self):
+            return iter(self._target_list)
+
+        def get_key(self, x):
+            return x.value
+
+        def enter(self, x):
+            pass
+
+        def update(self, x):
+            pass
+
+        def exit(self, k):
+            pass
+
+    def test_methods_are_restored_after_disable(self):
+        originals = (
+            base.Exec._try_cache_result,
+            base.Exec._cache_result,
+            elementwise.ElementwiseExec._try_cache_result,
+            base.BaseEnumerator._try_update,
+        )
+        with instrument.Profiler():
+            self.assertIsNot(base.Exec._try_cache_result, originals[0])
+        self.assertEqual(
+            (
+                base.Exec._try_cache_result,
+                base.Exec._cache_result,
+                elementwise.ElementwiseExec._try_cache_result,
+                base.BaseEnumerator._try_update,
+            ),
+            originals,
+        )
+
+    def test_profilers_cannot_be_nested(self):
+        with instrument.Profiler():
+            with self.assertRaises(instrument.ProfilerError):
+                instrument.Profiler().enable()
+
+    def test_recomputes_and_cache_hits_are_counted(self):
+        def add(a, b):
+            return a + b
+
+        a = base.Variable(1)
+        b = base.Variable(2)
+        sut = base.Function(add)(a, b)
+        with instrument.Profiler() as p:
+            p.label(sut, "sum")
+            sut.value
+            sut.value
+            a.value = 5
+            sut.value
+        stats = p.stats()
+        self.assertEqual(stats["sum"]["recomputes"], 2)
+        self.assertEqual(stats["sum"]["cache_hits"], 1)
+        self.assertEqual(stats["sum"]["freshness_checks"], 3)
+        self.assertTrue(stats["sum"]["exec_time"] > 0)
+        self.assertEqual(p.top("recomputes", 1), ["sum"])
+
+    def test_nested_nodes_get_own_entries(self):
+        arr = table.VariableArray("l", [1, 2, 3])
+        sut = elementwise.Not(arr < base.Variable(2))
+        with instrument.Profiler() as p:
+            sut.value
+        stats = p.stats()
+        self.assertEqual(len(stats), 2)
+        self.assertTrue(all(s["recomputes"] == 1 for s in stats.values()))
+        self.assertTrue(any(k.startswith("NotBase#") for k in stats))
+
+    def test_collected_nodes_are_not_kept_alive(self):
+        a = base.Variable(1)
+        f = base.Function(lambda x: x + 1)
+        with instrument.Profiler() as p:
+            for _ in range(100):
+                f(a).value
+        self.assertEqual(len(p.stats()), 100)
+        gc.collect()
+        self.assertEqual(len(p._labels), 0)
+
+    def test_enumerator_counts(self):
+        members = [base.Variable("a"), base.Variable("b")]
+        sut = self.EnumList(members)
+        with instrument.Profiler() as p:
+            p.label(sut, "enum")
+            sut.updated_at
+            members.pop()
+            members.append(base.Variable("c"))
+            sut.updated_at
+        stats = p.stats()["enum"]
+        self.assertEqual(stats["syncs"], 2)
+        self.assertEqual(stats["adds"], 3)
+        self.assertEqual(stats["discards"], 1)
+        self.assertEqual(stats["updates"], 0)
+
+    def test_exports(self):
+        a = base.Variable(1)
+        sut = base.Function(lambda x: x + 1)(base.Function(lambda x: x * 2)(a))
+        with instrument.Profiler() as p:
+            sut.value
+        trace = json.loads(json.dumps(p.chrome_trace()))
+        self.assertEqual(len(trace["traceEvents"]), 2 * 2 + 1)
+        self.assertTrue(all(e["ph"] == "X" for e in trace["traceEvents"]))
+        for line in p.folded(unit_ns=1).splitlines():
+            path, weight = line.rsplit(" ", 1)
+            self.assertTrue(int(weight) > 0)
+            self.assertTrue(path.endswith("]"))
+
+    def test_bulk_resync_counts_members(self):
+        members = [base.Variable(i) for i in range(5)]
+        sut = self.EnumList(members)
+        with instrument.Profiler() as p:
+            p.label(sut, "enum")
+            sut.resync(chunk_size=2)
+            del members[:2]
+            sut.resync(chunk_size=2)
+        stats = p.stats()["enum"]
+        self.assertEqual(stats["adds"], 5)
+        self.assertEqual(stats["discards"], 2)
+
+    def test_partial_refresh_is_not_a_cache_hit(self):
+        arr = table.VariableArray("l", [1, 2, 3])
+        sut = arr < base.Variable(3)
+        sut.value
+        time.sleep(0.01)
+        arr.set([0], [5])
+        with instrument.Profiler() as p:
+            p.label(sut, "lt")
+            self.assertEqual(list(sut.value), [False, True, False])
+        stats = p.stats()["lt"]
+        self.assertEqual(stats["partial_recomputes"], 1)
+        self.assertEqual(stats["recomputes"], 0)
+        self.assertEqual(stats["cache_hits"], 0)
+        self.assertTrue(stats["refresh_time"] > 0)
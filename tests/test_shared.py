@@ -0,0 +1,129 @@
+from unittest import TestCase
+
+import multiprocessing
+import os
+import pickle
+import struct
+import subprocess
+import sys
+import time
+from array import array
+
+import sendo
+from sendo import base, shared
+
+
+def _write_in_child(name, values):
+    sut = shared.SharedVariable.attach(name)
+    sut.value = array(sut.typecode, values)
+    sut.close()
+
+
+class SharedVariableTestCase(TestCase):
+    def setUp(self):
+        self.sut = shared.SharedVariable.create("d", 4, array("d", [1.0, 2.0]))
+
+    def tearDown(self):
+        self.sut.close()
+        self.sut.unlink()
+
+    def test_shared_variable_has_value(self):
+        self.assertEqual(self.sut.typecode, "d")
+        self.assertEqual(self.sut.capacity, 4)
+        self.assertEqual(self.sut.value.tolist(), [1.0, 2.0])
+        self.assertEqual(self.sut.snapshot(), array("d", [1.0, 2.0]))
+
+    def test_assignment_bumps_version(self):
+        t = self.sut.updated_at
+        v = self.sut.version
+        self.sut.value = array("d", [3.0, 4.0, 5.0])
+        self.assertTrue(v < self.sut.version)
+        self.assertTrue(t < self.sut.updated_at)
+        self.assertEqual(self.sut.value.tolist(), [3.0, 4.0, 5.0])
+
+    def test_value_larger_than_capacity_is_rejected(self):
+        with self.assertRaises(shared.CapacityError):
+            self.sut.value = array("d", [0.0] * 5)
+
+    def test_value_of_other_format_is_rejected(self):
+        with self.assertRaises(shared.FormatError):
+            self.sut.value = array("l", [1, 2])
+        with self.assertRaises(shared.FormatError):
+            self.sut.value = array("i", [1])
+        with self.assertRaises(shared.FormatError):
+            self.sut.value = b"12345678"
+        self.assertEqual(self.sut.value.tolist(), [1.0, 2.0])
+
+    def test_reader_gives_up_on_a_dead_writer(self):
+        other = shared.SharedVariable.attach(self.sut.name)
+        other.read_timeout = 0.05
+        seq = struct.unpack_from("<q", self.sut._shm.buf, 0)[0]
+        struct.pack_into("<q", self.sut._shm.buf, 0, seq + 1)
+        with self.assertRaises(shared.StaleWriterError):
+            other.version
+        with self.assertRaises(shared.StaleWriterError):
+            other.snapshot()
+        struct.pack_into("<q", self.sut._shm.buf, 0, seq)
+        self.assertEqual(other.snapshot(), array("d", [1.0, 2.0]))
+        other.close()
+
+    def test_segment_outlives_an_independent_reader(self):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            [os.path.dirname(os.path.dirname(sendo.__file__))]
+            + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else [])
+        )
+        code = (
+            "import sys\n"
+            "from sendo import shared\n"
+            "sut = shared.SharedVariable.attach(sys.argv[1])\n"
+            "print(sut.snapshot().tolist())\n"
+            "sut.close()\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code, self.sut.name],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "[1.0, 2.0]")
+        self.assertNotIn("leaked", result.stderr)
+        other = shared.SharedVariable.attach(self.sut.name)
+        self.assertEqual(other.snapshot(), array("d", [1.0, 2.0]))
+        other.close()
+
+    def test_attached_handle_sees_updates_without_copy(self):
+        other = shared.SharedVariable.attach(self.sut.name)
+        view = other.value
+        self.sut.value = array("d", [7.0, 8.0])
+        self.assertEqual(view.tolist(), [7.0, 8.0])
+        self.assertEqual(other.updated_at, self.sut.updated_at)
+        view.release()
+        other.close()
+
+    def test_handle_is_picklable_by_name(self):
+        other = pickle.loads(pickle.dumps(self.sut))
+        self.assertEqual(other.name, self.sut.name)
+        self.assertEqual(other.value.tolist(), [1.0, 2.0])
+        other.close()
+
+    def test_exec_detects_update_from_other_process(self):
+        call_count = []
+
+        def total(xs):
+            call_count.append(1)
+            return sum(xs)
+
+        sut = base.Function(total)(self.sut)
+        self.assertEqual(sut.value, 3.0)
+        self.assertEqual(sut.value, 3.0)
+        self.assertEqual(len(call_count), 1)
+        time.sleep(0.01)
+        p = multiprocessing.Process(
+            target=_write_in_child, args=(self.sut.name, [10.0, 20.0, 30.0])
+        )
+        p.start()
+        p.join()
+        self.assertEqual(sut.value, 60.0)
+        self.assertEqual(len(call_count), 2)
@@ -0,0 +1,177 @@
+from unittest import TestCase, skipUnless
+
+import os
+import pickle
+import tempfile
+import time
+
+from sendo import base, elementwise, snapshot, table
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class SnapshotTestCase(TestCase):
+    class Add2(base.BaseFunction):
+        def __init__(self):
+            super(SnapshotTestCase.Add2, self).__init__()
+            self._call_count = 0
+
+        def exec(self, a, b):
+            self._call_count += 1
+            return a + b
+
+    class EnumList(base.BaseEnumerator):
+        def __init__(self, target_list):
+            super(SnapshotTestCase.EnumList, self).__init__()
+            self._target_list = target_list
+            self._cached_result = {}
+            self._enter_count = 0
+
+        def enumerate(self):
+            return iter(self._target_list)
+
+        def get_key(self, x):
+            return x.value[0]
+
+        def enter(self, x):
+            self._enter_count += 1
+            self._cached_result[self.get_key(x)] = x.value[1]
+
+        def update(self, x):
+            self._cached_result[self.get_key(x)] = x.value[1]
+
+        def exit(self, k):
+            del self._cached_result[k]
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = self._dir.name
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def build(self, a_value=3):
+        f = self.Add2()
+        a = base.Variable(a_value)
+        b = base.Variable(5)
+        return f, a, f(f(a, b), b)
+
+    def test_restored_nodes_are_served_without_recomputation(self):
+        f, _, sut = self.build()
+        self.assertEqual(sut.value, 13)
+        self.assertEqual(f._call_count, 2)
+        snapshot.save(self.path, {"sut": sut})
+        time.sleep(0.01)
+        f, a, sut = self.build()
+        restored = snapshot.load(self.path, {"sut": sut})
+        self.assertIn("sut", restored)
+        self.assertIn("sut.0.0", restored)
+        self.assertEqual(sut.value, 13)
+        self.assertEqual(f._call_count, 0)
+        a.value = 4
+        self.assertEqual(sut.value, 14)
+        self.assertEqual(f._call_count, 2)
+
+    def test_overwrite_replaces_current_values(self):
+        _, _, sut = self.build()
+        self.assertEqual(sut.value, 13)
+        snapshot.save(self.path, {"sut": sut})
+        time.sleep(0.01)
+        f, a, sut = self.build(a_value=0)
+        restored = snapshot.load(self.path, {"sut": sut}, overwrite=True)
+        self.assertIn("sut.0.0", restored)
+        self.assertEqual(a.value, 3)
+        self.assertEqual(sut.value, 13)
+        self.assertEqual(f._call_count, 0)
+
+    def test_changed_inputs_are_recomputed_without_overwrite(self):
+        _, _, sut = self.build()
+        self.assertEqual(sut.value, 13)
+        snapshot.save(self.path, {"sut": sut})
+        time.sleep(0.01)
+        f, _, sut = self.build(a_value=4)
+        restored = snapshot.load(self.path, {"sut": sut}, overwrite=False)
+        self.assertNotIn("sut.0.0", restored)
+        self.assertIn("sut.0.1", restored)
+        self.assertEqual(sut.value, 14)
+        self.assertEqual(f._call_count, 2)
+        time.sleep(0.01)
+        f, _, sut = self.build(a_value=3)
+        snapshot.load(self.path, {"sut": sut}, overwrite=False)
+        self.assertEqual(sut.value, 13)
+        self.assertEqual(f._call_count, 0)
+
+    def test_enumerator_bookkeeping_is_restored(self):
+        members = [base.Variable(("a", 1)), base.Variable(("b", 2))]
+        sut = self.EnumList(members)
+        self.assertEqual(sut.value, {"a": 1, "b": 2})
+        snapshot.save(self.path, {"enum": sut})
+        sut = self.EnumList(members)
+        snapshot.load(self.path, {"enum": sut})
+        self.assertEqual(sut.value, {"a": 1, "b": 2})
+        self.assertEqual(sut._enter_count, 0)
+        members.append(base.Variable(("c", 3)))
+        self.assertEqual(sut.value, {"a": 1, "b": 2, "c": 3})
+        self.assertEqual(sut._enter_count, 1)
+
+    def test_variable_array_and_elementwise_results_are_restored(self):
+        arr = table.VariableArray("l", [1, 5, 2])
+        t = base.Variable(3)
+        sut = elementwise.Lt(arr, t)
+        self.assertEqual(list(sut.value), [True, False, True])
+        snapshot.save(self.path, {"sut": sut})
+        arr = table.VariableArray("l", [1, 5, 2])
+        t = base.Variable(3)
+        sut = elementwise.Lt(arr, t)
+        restored = snapshot.load(self.path, {"sut": sut})
+        self.assertEqual(restored, {"sut", "sut.func", "sut.0", "sut.1"})
+        self.assertEqual(list(sut.value), [True, False, True])
+        time.sleep(0.01)
+        arr.set([1], [0])
+        self.assertEqual(list(sut.value), [True, True, True])
+
+    def test_other_format_is_rejected(self):
+        _, _, sut = self.build()
+        snapshot.save(self.path, {"sut": sut})
+        with open(os.path.join(self.path, snapshot.MANIFEST), "wb") as f:
+            pickle.dump({"format": snapshot.FORMAT_VERSION + 1, "nodes": {}}, f)
+        with self.assertRaises(snapshot.SnapshotFormatError):
+            snapshot.load(self.path, {"sut": sut})
+
+    @skipUnless(numpy is not None, "numpy is not installed")
+    def test_resave_removes_unreferenced_arrays(self):
+        n = snapshot.MMAP_THRESHOLD // 8
+        a = base.Variable(numpy.zeros(n))
+        snapshot.save(self.path, {"a": a})
+        snapshot.load(self.path, {"a": base.Variable(None)}, overwrite=True)
+        a.value = numpy.ones(n)
+        snapshot.save(self.path, {"a": a})
+        self.assertEqual(len(os.listdir(os.path.join(self.path, snapshot.ARRAYS))), 1)
+        sut = base.Variable(None)
+        snapshot.load(self.path, {"a": sut}, overwrite=True)
+        numpy.testing.assert_array_equal(sut.value, numpy.ones(n))
+
+    @skipUnless(numpy is not None, "numpy is not installed")
+    def test_save_leaves_foreign_files_alone(self):
+        own = os.path.join(self.path, "my_important.npy")
+        numpy.save(own, numpy.arange(3))
+        a = base.Variable(numpy.zeros(snapshot.MMAP_THRESHOLD // 8))
+        snapshot.save(self.path, {"a": a})
+        snapshot.save(self.path, {"a": a})
+        numpy.testing.assert_array_equal(numpy.load(own), numpy.arange(3))
+        self.assertEqual(len(os.listdir(os.path.join(self.path, snapshot.ARRAYS))), 1)
+
+    @skipUnless(numpy is not None, "numpy is not installed")
+    def test_large_arrays_are_memory_mapped(self):
+        a = base.Variable(numpy.arange(snapshot.MMAP_THRESHOLD // 8, dtype=float))
+        sut = base.Function(lambda x: x * 2)(a)
+        expected = sut.value.copy()
+        snapshot.save(self.path, {"sut": sut})
+        a = base.Variable(numpy.arange(snapshot.MMAP_THRESHOLD // 8, dtype=float))
+        sut = base.Function(lambda x: x * 2)(a)
+        snapshot.load(self.path, {"sut": sut})
+        self.assertIsInstance(sut.value, numpy.memmap)
+        numpy.testing.assert_array_equal(sut.value, expected)
@@ -0,0 +1,165 @@
+from unittest import TestCase
+
+import time
+
+from sendo import base, table
+
+
+class VariableArrayTestCase(TestCase):
+    def test_variable_array_has_values(self):
+        sut = table.VariableArray("d", [1.0, 2.0, 3.0])
+        self.assertEqual(len(sut), 3)
+        self.assertEqual(list(sut.value), [1.0, 2.0, 3.0])
+        self.assertEqual(sut[1].value, 2.0)
+        self.assertEqual(sut[-1].value, 3.0)
+        self.assertEqual(sut[0].updated_at, sut.updated_at)
+        with self.assertRaises(IndexError):
+            _ = sut[3]
+
+    def test_set_updates_only_touched_cells(self):
+        sut = table.VariableArray("l", range(5))
+        t = sut.updated_at
+        time.sleep(0.1)
+        sut.set([1, 3], [10, 30])
+        self.assertEqual(list(sut.value), [0, 10, 2, 30, 4])
+        self.assertEqual(sut[0].updated_at, t)
+        self.assertEqual(sut[1].updated_at, sut.updated_at)
+        self.assertEqual(sut[3].updated_at, sut.updated_at)
+        self.assertTrue(t < sut.updated_at)
+
+    def test_set_accepts_slice(self):
+        sut = table.VariableArray("l", range(5))
+        time.sleep(0.1)
+        sut.set(slice(1, 3), [7, 8])
+        self.assertEqual(list(sut.value), [0, 7, 8, 3, 4])
+        self.assertEqual(sut[2].updated_at, sut.updated_at)
+        self.assertTrue(sut[3].updated_at < sut.updated_at)
+        with self.assertRaises(table.LengthMismatchError):
+            sut.set(slice(0, 2), [1, 2, 3])
+
+    def test_set_accepts_reversed_slice(self):
+        sut = table.VariableArray("l", range(5))
+        time.sleep(0.01)
+        sut.set(slice(None, None, -1), [9, 8, 7, 6, 5])
+        self.assertEqual(list(sut.value), [5, 6, 7, 8, 9])
+        sut.set(slice(3, None, -2), [1, 2])
+        self.assertEqual(list(sut.value), [5, 2, 7, 1, 9])
+        self.assertEqual(sut[1].updated_at, sut.updated_at)
+        self.assertTrue(sut[4].updated_at < sut.updated_at)
+
+    def test_failing_set_writes_nothing(self):
+        sut = table.VariableArray("l", [1, 2, 3])
+        lt = sut < base.Variable(3)
+        self.assertEqual(list(lt.value), [True, True, False])
+        t = sut.updated_at
+        time.sleep(0.01)
+        with self.assertRaises(table.LengthMismatchError):
+            sut.set([0, 1, 2], [9])
+        with self.assertRaises(IndexError):
+            sut.set([0, 9], [5, 5])
+        with self.assertRaises(TypeError):
+            sut.set([0, 1], [5, "x"])
+        self.assertEqual(list(sut.value), [1, 2, 3])
+        self.assertEqual(sut.updated_at, t)
+        self.assertEqual(list(lt.value), [True, True, False])
+        sut.set([-3], [5])
+        self.assertEqual(list(lt.value), [False, True, False])
+
+    def test_cell_assignment_writes_through(self):
+        sut = table.VariableArray("l", range(3))
+        sut[2].value = 9
+        self.assertEqual(list(sut.value), [0, 1, 9])
+
+    def test_cell_behaves_like_variable_in_exec(self):
+        call_count = []
+
+        def double(x):
+            call_count.append(x)
+            return 2 * x
+
+        arr = table.VariableArray("l", range(3))
+        f = base.Function(double)
+        sut0 = f(arr[0])
+        sut1 = f(arr[1])
+        self.assertEqual(sut0.value, 0)
+        self.assertEqual(sut1.value, 2)
+        self.assertEqual(len(call_count), 2)
+        time.sleep(0.01)
+        arr.set([1], [5])
+        self.assertEqual(sut0.value, 0)
+        self.assertEqual(sut1.value, 10)
+        self.assertEqual(len(call_count), 3)
+
+    def test_cell_comparison_builds_exec(self):
+        arr = table.VariableArray("l", [3, 4])
+        sut = arr[0] < arr[1]
+        self.assertTrue(sut.value)
+        with self.assertRaises(TypeError):
+            _ = bool(arr[0])
+
+
+class VariableTableTestCase(TestCase):
+    def test_columns_must_have_same_length(self):
+        with self.assertRaises(table.LengthMismatchError):
+            table.VariableTable(
+                {
+                    "a": table.VariableArray("l", [1, 2]),
+                    "b": table.VariableArray("l", [1]),
+                }
+            )
+
+    def test_table_rows_and_bulk_set(self):
+        sut = table.VariableTable(
+            {
+                "a": table.VariableArray("l", [1, 2, 3]),
+                "b": table.VariableArray("d", [0.5, 1.5, 2.5]),
+            }
+        )
+        self.assertEqual(len(sut), 3)
+        self.assertEqual(sut.row(1).value, {"a": 2, "b": 1.5})
+        t = sut.row(0).updated_at
+        time.sleep(0.1)
+        sut.set(iter([0, 2]), {"a": [10, 30]})
+        self.assertEqual(list(sut["a"].value), [10, 2, 30])
+        self.assertEqual(sut.cell(2, "a").value, 30)
+        self.assertEqual(sut.row(0).updated_at, sut.updated_at)
+        self.assertEqual(sut.row(1).updated_at, t)
+
+    def test_failing_table_set_writes_nothing(self):
+        sut = table.VariableTable(
+            {
+                "a": table.VariableArray("l", [1, 2]),
+                "b": table.VariableArray("l", [3, 4]),
+            }
+        )
+        with self.assertRaises(KeyError):
+            sut.set([0], {"a": [10], "c": [30]})
+        with self.assertRaises(table.LengthMismatchError):
+            sut.set([0], {"a": [10], "b": [30, 40]})
+        self.assertEqual(list(sut["a"].value), [1, 2])
+        self.assertEqual(list(sut["b"].value), [3, 4])
+
+    def test_row_in_exec_recomputes_only_when_row_touched(self):
+        sut_table = table.VariableTable(
+            {
+                "a": table.VariableArray("l", [1, 2]),
+                "b": table.VariableArray("l", [3, 4]),
+            }
+        )
+        call_count = []
+
+        def total(row):
+            call_count.append(row)
+            return row["a"] + row["b"]
+
+        f = base.Function(total)
+        sut = f(sut_table.row(0))
+        self.assertEqual(sut.value, 4)
+        time.sleep(0.01)
+        sut_table.set([1], {"b": [40]})
+        self.assertEqual(sut.value, 4)
+        self.assertEqual(len(call_count), 1)
+        time.sleep(0.01)
+        sut_table.set([0], {"b": [30]})
+        self.assertEqual(sut.value, 31)
+        self.assertEqual(len(call_count), 2)